@@ -1,7 +1,7 @@
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from utils.ai import PromptLoader, HistoryManager, GeminiProvider
+from utils.ai import PromptLoader, HistoryManager, HistoryWriter, GeminiProvider
 from utils.logger import Logger  # Neu: Import des Loggers
 from datetime import datetime
 
@@ -12,7 +12,7 @@ load_dotenv()
 log = Logger("Chatbot")
 
 class GuiliaChatbot:
-    def __init__(self, session_id="default_user", ai_model=None):               
+    def __init__(self, session_id="default_user", ai_model=None, history_writer=None, history_dir="data/chat_history"):               
         # Der Provider kapselt jetzt ALLES (Client, Modell-Name, Retries)
         self.ai_model = ai_model or GeminiProvider()
         
@@ -21,7 +21,11 @@ class GuiliaChatbot:
         model_tag = getattr(self.ai_model, "model_name", None)
 
         self.loader = PromptLoader(default_model_tag=model_tag)
-        self.history_manager = HistoryManager(provider_type=provider_type)
+        self.history_manager = HistoryManager(storage_dir=history_dir, provider_type=provider_type)
+
+        # Write-behind: Die Historie wird im Hintergrund gespeichert, nicht im Antwortpfad.
+        # Ohne eigenen Writer teilen sich alle Sessions den prozessweiten Writer (ein Thread).
+        self.history_writer = history_writer or HistoryWriter.default()
 
         self.session_id = session_id
         now = datetime.now().strftime("%I:%M %p")
@@ -63,10 +67,14 @@ class GuiliaChatbot:
             model_msg = types.Content(role="model", parts=[types.Part(text=response_text)])
             self.messages.append(model_msg)
             
-            self.history_manager.save_history(self.session_id, self.messages)
+            self.history_writer.submit(self.session_id, self.messages, self.history_manager)
 
             return response_text
         
         except Exception as e:
             log.error(f"Error in Chatbot.get_response: {e}")
-            return "Something went wrong in the office. Check the logs, boss?"
\ No newline at end of file
+            return "Something went wrong in the office. Check the logs, boss?"
+
+    def close(self):
+        """Writes any pending history to disk. The writer itself is shared and keeps running."""
+        self.history_writer.flush()
@@ -0,0 +1,306 @@
+import argparse
+import gc
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from chatbot import GuiliaChatbot
+from utils.ai import HistoryManager, HistoryWriter, LatencyMockProvider, CoalescingProvider
+from utils.db import DBInterface, PrefetchingProvider, SharedBOMCache
+from utils.db.providers import CIMDBProvider, CIMDBStubServer, FakeDBProvider
+from utils.logger import Logger
+
+log = Logger("LoadTest")
+
+QUESTIONS = [
+    "What is the structure of {part}?",
+    "Which items are used in {part}?",
+    "Is {part} released?",
+    "Summarize {part} for the steering committee.",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (Linux), or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def fd_usage() -> Dict[str, Optional[int]]:
+    """Open file descriptors and sockets of this process (Linux), None where unavailable."""
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return {"fds": None, "sockets": None}
+
+    sockets = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            continue
+    return {"fds": len(fds), "sockets": sockets}
+
+
+def build_stub_fixtures(root_parts: int, seed: int) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Materializes the synthetic product structure of FakeDBProvider as CIMDB stub fixtures."""
+    fake = FakeDBProvider(latency=0, jitter=0, seed=seed)
+    items: Dict[str, Dict[str, Any]] = {}
+    boms: Dict[str, List[Dict[str, Any]]] = {}
+
+    pending = [f"ASM-{i}" for i in range(root_parts)]
+    while pending:
+        part = pending.pop()
+        items[part] = fake.get_item_details(part)
+        boms[part] = fake.get_bom_first_level(part)
+        for row in boms[part]:
+            if row["item_type"] == "ASSEMBLY":
+                pending.append(row["child_id"])
+            else:
+                items[row["child_id"]] = fake.get_item_details(row["child_id"])
+    return items, boms
+
+
+class SimulatedSession:
+    """One simulated user: drills into the product structure and asks Giulia about it."""
+
+    def __init__(self, session_id: str, ai_model, db: DBInterface, history_writer: HistoryWriter,
+                 history_dir: str, messages: int, think_time: float, root_part: str, seed: int):
+        self.bot = GuiliaChatbot(session_id=session_id, ai_model=ai_model,
+                                 history_writer=history_writer, history_dir=history_dir)
+        self.db = db
+        self.messages = messages
+        self.think_time = think_time
+        self.part = root_part
+        self.random = random.Random(seed)
+        self.chat_latencies: List[float] = []
+        self.db_latencies: List[float] = []
+        self.errors = 0
+
+    def run(self) -> None:
+        for _ in range(self.messages):
+            try:
+                start = time.perf_counter()
+                children = self.db.get_bom_first_level(self.part)
+                if children:
+                    self.db.get_item_details(children[0]["child_id"])
+                self.db_latencies.append(time.perf_counter() - start)
+
+                question = self.random.choice(QUESTIONS).format(part=self.part)
+                start = time.perf_counter()
+                self.bot.get_response(question)
+                self.chat_latencies.append(time.perf_counter() - start)
+
+                # Drill down into a child, or start over at the root when reaching a leaf.
+                if children:
+                    self.part = self.random.choice(children)["child_id"]
+            except Exception as e:
+                self.errors += 1
+                log.error(f"Simulated session failed: {e}")
+
+            if self.think_time:
+                time.sleep(self.random.uniform(0, self.think_time))
+
+
+def run_stage(concurrency: int, args, ai_model, db: DBInterface, history_writer: HistoryWriter,
+              history_dir: str, stage: int) -> Dict[str, float]:
+    """Runs `concurrency` sessions in parallel and returns the measured figures."""
+    gc.collect()
+    rss_before = rss_bytes()
+
+    sessions = [
+        SimulatedSession(
+            session_id=f"loadtest_{stage}_{i}",
+            ai_model=ai_model,
+            db=db,
+            history_writer=history_writer,
+            history_dir=history_dir,
+            messages=args.messages,
+            think_time=args.think_time,
+            root_part=f"ASM-{i % args.root_parts}",
+            seed=args.seed + stage * 100000 + i,
+        )
+        for i in range(concurrency)
+    ]
+
+    peak = {"threads": 0, "fds": 0, "sockets": 0}
+    sampling = threading.Event()
+
+    def sample() -> None:
+        usage = fd_usage()
+        peak["threads"] = max(peak["threads"], threading.active_count())
+        peak["fds"] = max(peak["fds"], usage["fds"] or 0)
+        peak["sockets"] = max(peak["sockets"], usage["sockets"] or 0)
+
+    def sample_periodically() -> None:
+        while not sampling.wait(0.2):
+            sample()
+
+    sampler = threading.Thread(target=sample_periodically, name="loadtest-sampler", daemon=True)
+    sampler.start()
+
+    # Sample before the sessions start and once they are done, so stages shorter
+    # than the sampling interval are measured too.
+    sample()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="session") as executor:
+        list(executor.map(lambda session: session.run(), sessions))
+        sample()
+    duration = time.perf_counter() - start
+
+    sampling.set()
+    sampler.join()
+    rss_after = rss_bytes()
+
+    chat = sorted(latency for session in sessions for latency in session.chat_latencies)
+    db_lat = sorted(latency for session in sessions for latency in session.db_latencies)
+
+    result = {
+        "sessions": concurrency,
+        "requests": len(chat),
+        "errors": sum(session.errors for session in sessions),
+        "duration_s": duration,
+        "throughput_rps": len(chat) / duration if duration else 0.0,
+        "chat_p50_ms": percentile(chat, 50) * 1000,
+        "chat_p95_ms": percentile(chat, 95) * 1000,
+        "chat_p99_ms": percentile(chat, 99) * 1000,
+        "chat_max_ms": (chat[-1] if chat else 0.0) * 1000,
+        "db_p50_ms": percentile(db_lat, 50) * 1000,
+        "db_p95_ms": percentile(db_lat, 95) * 1000,
+        "mem_per_session_kib": ((rss_after - rss_before) / concurrency / 1024)
+        if rss_before is not None and rss_after is not None else float("nan"),
+        "peak_threads": peak["threads"],
+        "peak_fds": peak["fds"],
+        "peak_sockets": peak["sockets"],
+    }
+
+    for session in sessions:
+        session.bot.close()
+    return result
+
+
+def print_report(results: List[Dict[str, float]], db, history_writer: HistoryWriter,
+                 stub: Optional[CIMDBStubServer] = None) -> None:
+    header = (f"{'sessions':>8} {'reqs':>6} {'err':>4} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8} {'db p50':>8} {'db p95':>8} {'KiB/sess':>9} "
+              f"{'threads':>7} {'fds':>5} {'socks':>5}")
+    print("\n--- 🍷 Giulia load test report ---")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['sessions']:>8} {r['requests']:>6} {r['errors']:>4} {r['throughput_rps']:>8.2f} "
+              f"{r['chat_p50_ms']:>8.1f} {r['chat_p95_ms']:>8.1f} {r['chat_p99_ms']:>8.1f} {r['chat_max_ms']:>8.1f} "
+              f"{r['db_p50_ms']:>8.1f} {r['db_p95_ms']:>8.1f} {r['mem_per_session_kib']:>9.1f} "
+              f"{r['peak_threads']:>7} {r['peak_fds']:>5} {r['peak_sockets']:>5}")
+
+    if stub is None:
+        print("\nNote: the fake database opens no connections, so 'socks' only counts unrelated sockets. "
+              "Use --cimdb-stub to measure connection usage.")
+    else:
+        print(f"\nCIMDB stub: {stub.connection_count} connections accepted, {stub.request_count} requests, "
+              f"{stub.not_modified_count} answered with 304. 'socks' and 'threads' include the in-process "
+              f"server side of every connection.")
+    if isinstance(db, PrefetchingProvider):
+        print(f"DB prefetch cache: {db.stats}")
+    print(f"History writer: {history_writer.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giulia AI - Load test with simulated chat sessions")
+    parser.add_argument("--sessions", type=int, default=50, help="Maximum number of concurrent sessions.")
+    parser.add_argument("--ramp", type=int, nargs="+", default=None,
+                        help="Concurrency levels to run, e.g. 1 10 50. Defaults to doubling up to --sessions.")
+    parser.add_argument("--messages", type=int, default=5, help="Messages sent per session.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Maximum random pause between messages (s).")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Base latency of the mock model (s).")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="Additional random model latency (s).")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Base latency of the fake database (s).")
+    parser.add_argument("--db-jitter", type=float, default=0.01,
+                        help="Additional random database latency (s). Not applied with --cimdb-stub.")
+    parser.add_argument("--cimdb-stub", action="store_true",
+                        help="Serve the product structure through a local CIMDB stub server and CIMDBProvider, "
+                             "so connection pooling and socket usage are real.")
+    parser.add_argument("--pool-size", type=int, default=8, help="CIMDB connection pool size (with --cimdb-stub).")
+    parser.add_argument("--root-parts", type=int, default=10, help="Number of distinct root assemblies.")
+    parser.add_argument("--prefetch", action="store_true", help="Enable speculative BOM prefetching.")
+    parser.add_argument("--coalesce", action="store_true", help="Coalesce identical in-flight model calls (only hits for equal prompt and history).")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="History write-behind interval (s).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for simulated behaviour.")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging enabled during the run.")
+    args = parser.parse_args()
+
+    ramp = args.ramp or []
+    if not ramp:
+        level = 1
+        while level < args.sessions:
+            ramp.append(level)
+            level *= 2
+        ramp.append(args.sessions)
+
+    if not args.verbose:
+        # Per-message INFO logs would dominate the measurement.
+        logging.disable(logging.INFO)
+
+    ai_model = LatencyMockProvider(latency=args.llm_latency, jitter=args.llm_jitter, seed=args.seed)
+    if args.coalesce:
+        ai_model = CoalescingProvider(ai_model)
+
+    stub: Optional[CIMDBStubServer] = None
+    if args.cimdb_stub:
+        items, boms = build_stub_fixtures(args.root_parts, args.seed)
+        stub = CIMDBStubServer(items=items, boms=boms, latency=args.db_latency).start()
+
+    def new_provider(seed: int) -> DBInterface:
+        if stub is not None:
+            return CIMDBProvider(api_key=stub.api_key, base_url=stub.base_url, pool_size=args.pool_size)
+        return FakeDBProvider(latency=args.db_latency, jitter=args.db_jitter, seed=seed)
+
+    db: DBInterface = new_provider(args.seed)
+    if args.prefetch:
+        db = PrefetchingProvider(db, cache=SharedBOMCache(), background_provider=new_provider(args.seed + 1))
+
+    history_dir = tempfile.mkdtemp(prefix="giulia_loadtest_")
+    history_writer = HistoryWriter(HistoryManager(storage_dir=history_dir, provider_type=ai_model.get_type()),
+                                   flush_interval=args.flush_interval)
+
+    print(f"Running stages {ramp} with {args.messages} message(s) per session "
+          f"(LLM {args.llm_latency}s+{args.llm_jitter}s, DB {args.db_latency}s+{args.db_jitter}s)...")
+    results = []
+    try:
+        for stage, concurrency in enumerate(ramp):
+            result = run_stage(concurrency, args, ai_model, db, history_writer, history_dir, stage)
+            results.append(result)
+            print(f"  stage {stage + 1}/{len(ramp)}: {concurrency} sessions, "
+                  f"{result['throughput_rps']:.2f} req/s, p95 {result['chat_p95_ms']:.0f} ms")
+    finally:
+        history_writer.close()
+        db.disconnect()
+        if stub is not None:
+            stub.stop()
+        shutil.rmtree(history_dir, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    print_report(results, db, history_writer, stub)
+    return 0 if all(r["errors"] == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -63,6 +63,7 @@ def main():
 
         # 2. Check for exit command
         if user_input.lower() in ["exit", "quit"]:
+            guilia.close()
             print("\nGiulia: Leaving so soon? I'll be waiting for your return, boss.")
             break
 
@@ -70,7 +71,7 @@ def main():
             continue
 
         # 3. Get and print response
-        # The history saving is handled internally in bot.get_response()
+        # The history is saved in the background after bot.get_response() returns
         print("ℹ️  Giulia is thinking...")
         reply = guilia.get_response(user_input)
         
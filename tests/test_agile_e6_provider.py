@@ -0,0 +1,165 @@
+import oracledb
+import pytest
+
+from utils.db.providers import AGILE_E6_QUERIES, AgileE6Provider
+from utils.db.providers.agile_e6_queries import BOM_FIRST_LEVEL, ITEM_DETAILS
+
+
+class StubCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params, self.arraysize, self.prefetchrows))
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.description = [(name.upper(),) for name in self.connection.columns]
+
+    def executemany(self, sql, rows):
+        self.connection.batches.append((sql, list(rows)))
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        return list(self.connection.rows)
+
+    def fetchmany(self, size):
+        return list(self.connection.rows[:size])
+
+
+class StubConnection:
+    """Records what the provider sends instead of talking to Oracle."""
+
+    def __init__(self, columns=(), rows=(), error=None):
+        self.columns = list(columns)
+        self.rows = list(rows)
+        self.error = error
+        self.executed = []
+        self.batches = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return StubCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def make_provider(connection):
+    provider = AgileE6Provider("user", "password", "db.example:1521/E6", stmtcachesize=40)
+    provider.connection = connection
+    return provider
+
+
+def test_connect_passes_statement_cache_size(monkeypatch):
+    calls = []
+    monkeypatch.setattr(oracledb, "connect", lambda **kwargs: calls.append(kwargs) or StubConnection())
+
+    make_provider(None)._get_connection()
+
+    assert calls == [{"user": "user", "password": "password", "dsn": "db.example:1521/E6", "stmtcachesize": 40}]
+
+
+def test_execute_query_passes_binds_separately_from_sql():
+    connection = StubConnection(rows=[(1,)])
+
+    assert make_provider(connection).execute_query("SELECT 1 FROM dual WHERE x = :x", {"x": 5}) == [(1,)]
+    assert connection.executed[0][:2] == ("SELECT 1 FROM dual WHERE x = :x", {"x": 5})
+
+
+def test_bom_lookups_reuse_one_statement_with_tuned_cursor():
+    connection = StubConnection(columns=["child_id", "pos_no"], rows=[("PRT-1", 10)])
+    provider = make_provider(connection)
+
+    assert provider.get_bom_first_level(" ASM-1 ") == [{"child_id": "PRT-1", "pos_no": 10}]
+    provider.get_bom_first_level("ASM-2")
+
+    # Same statement text for every part: only the binds differ, so the parse is reused.
+    assert [(sql, params) for sql, params, *_ in connection.executed] == [
+        (BOM_FIRST_LEVEL.sql, {"part_id": "ASM-1"}),
+        (BOM_FIRST_LEVEL.sql, {"part_id": "ASM-2"}),
+    ]
+    assert {(arraysize, prefetchrows) for _, _, arraysize, prefetchrows in connection.executed} == {(1000, 1000)}
+
+
+def test_item_details_fetches_a_single_row():
+    connection = StubConnection(columns=["part_id"], rows=[("ASM-1",), ("ASM-1-dup",)])
+
+    assert make_provider(connection).get_item_details("ASM-1") == {"part_id": "ASM-1"}
+    sql, params, arraysize, prefetchrows = connection.executed[0]
+    assert (sql, params) == (ITEM_DETAILS.sql, {"part_id": "ASM-1"})
+    assert (arraysize, prefetchrows) == (ITEM_DETAILS.arraysize, ITEM_DETAILS.prefetchrows) == (1, 2)
+
+
+@pytest.mark.parametrize("name", sorted(AGILE_E6_QUERIES))
+def test_execute_named_uses_registered_tuning(name):
+    connection = StubConnection(columns=["value"], rows=[("x",)])
+    query = AGILE_E6_QUERIES[name]
+
+    assert make_provider(connection).execute_named(name, {"part_id": "ASM-1"}) == [{"value": "x"}]
+    assert connection.executed == [(query.sql, {"part_id": "ASM-1"}, query.arraysize, query.prefetchrows)]
+
+
+def test_execute_named_rejects_unknown_query():
+    with pytest.raises(KeyError):
+        make_provider(StubConnection()).execute_named("no_such_query")
+
+
+def test_execute_many_sends_batches_and_commits_once():
+    connection = StubConnection()
+    rows = [{"id": i} for i in range(25)]
+
+    affected = make_provider(connection).execute_many("UPDATE t SET x = 1 WHERE id = :id", rows, batch_size=10)
+
+    assert affected == 25
+    assert [len(batch) for _, batch in connection.batches] == [10, 10, 5]
+    assert [row for _, batch in connection.batches for row in batch] == rows
+    assert connection.commits == 1
+
+
+def test_execute_many_rolls_back_on_error():
+    connection = StubConnection()
+
+    def failing_executemany(sql, rows):
+        raise oracledb.DatabaseError("ORA-00001: unique constraint violated")
+
+    cursor = StubCursor(connection)
+    cursor.executemany = failing_executemany
+    connection.cursor = lambda: cursor
+
+    with pytest.raises(oracledb.DatabaseError):
+        make_provider(connection).execute_many("INSERT INTO t VALUES (:id)", [{"id": 1}])
+    assert (connection.commits, connection.rollbacks) == (0, 1)
+
+
+def test_query_errors_yield_empty_results_but_connection_errors_raise(monkeypatch):
+    connection = StubConnection(error=oracledb.DatabaseError("ORA-00942: table or view does not exist"))
+    provider = make_provider(connection)
+    assert provider.get_bom_first_level("ASM-1") == []
+    assert provider.get_item_details("ASM-1") == {}
+
+    def refuse(**kwargs):
+        raise oracledb.OperationalError("DPY-6005: cannot connect to database")
+
+    monkeypatch.setattr(oracledb, "connect", refuse)
+    offline = make_provider(None)
+    with pytest.raises(oracledb.OperationalError):
+        offline.get_item_details("ASM-1")
+    with pytest.raises(oracledb.OperationalError):
+        offline.get_bom_first_level("ASM-1")
@@ -0,0 +1,94 @@
+import pytest
+
+from utils.db import EnvironmentFanOut, diff_bom
+from utils.db.providers import FakeDBProvider
+
+
+def row(pos_no, child_id, **fields):
+    return {"pos_no": pos_no, "child_id": child_id, "item_type": "PART", "lev_ind": 1,
+            "chk_name": child_id, "cur_flag": "y", **fields}
+
+
+def test_identical_boms():
+    rows = [row(10, "A"), row(20, "B")]
+
+    diff = diff_bom(rows, [dict(r) for r in reversed(rows)])
+
+    assert diff.is_identical
+    assert diff.unchanged_count == 2
+
+
+def test_added_removed_and_changed_lines():
+    left = [row(30, "C"), row(10, "A"), row(20, "B")]
+    right = [row(10, "A"), row(20, "B", cur_flag="n"), row(40, "D")]
+
+    diff = diff_bom(left, right)
+
+    assert [r["pos_no"] for r in diff.removed] == [30]
+    assert [r["pos_no"] for r in diff.added] == [40]
+    assert len(diff.changed) == 1
+    key, left_row, right_row, fields = diff.changed[0]
+    assert key == (20,)
+    assert (left_row["cur_flag"], right_row["cur_flag"]) == ("y", "n")
+    assert fields == ["cur_flag"]
+    assert diff.unchanged_count == 1
+
+
+def test_part_swap_with_child_id_in_key():
+    left = [row(10, "A")]
+    right = [row(10, "B")]
+
+    assert [f for *_, f in diff_bom(left, right).changed] == [["child_id", "chk_name"]]
+
+    diff = diff_bom(left, right, key_fields=("pos_no", "child_id"))
+    assert [r["child_id"] for r in diff.removed] == ["A"]
+    assert [r["child_id"] for r in diff.added] == ["B"]
+
+
+def test_repeated_positions_are_not_dropped():
+    left = [row(10, "A"), row(10, "A")]
+    right = [row(10, "A")]
+
+    diff = diff_bom(left, right)
+
+    assert len(diff.removed) == 1
+    assert diff.unchanged_count == 1
+
+
+def test_compare_bom_skips_environment_with_suspect_empty_level():
+    class BrokenProvider(FakeDBProvider):
+        def get_bom_first_level(self, parent_part_id):
+            return []  # what a provider returns after swallowing a query error
+
+    providers = {
+        "PROD": FakeDBProvider(latency=0, jitter=0),
+        "QS": FakeDBProvider(latency=0, jitter=0),
+        "BLD": BrokenProvider(latency=0, jitter=0),
+    }
+    with EnvironmentFanOut(["PROD", "QS", "BLD"], providers=providers) as fan_out:
+        diffs = fan_out.compare_bom("ASM-1", base_env="PROD")
+        assert set(diffs) == {"QS"}
+        assert diffs["QS"].is_identical
+
+        diffs = fan_out.compare_bom("ASM-1", base_env="PROD", allow_empty=True)
+        assert len(diffs["BLD"].removed) == providers["PROD"].fanout
+
+
+def test_compare_bom_rejects_suspect_empty_base_level():
+    class BrokenProvider(FakeDBProvider):
+        def get_bom_first_level(self, parent_part_id):
+            return []
+
+    providers = {
+        "PROD": BrokenProvider(latency=0, jitter=0),
+        "QS": FakeDBProvider(latency=0, jitter=0),
+    }
+    with EnvironmentFanOut(["PROD", "QS"], providers=providers) as fan_out:
+        with pytest.raises(RuntimeError, match="empty in base environment PROD"):
+            fan_out.compare_bom("ASM-1", base_env="PROD")
+
+        diffs = fan_out.compare_bom("ASM-1", base_env="PROD", allow_empty=True)
+        assert len(diffs["QS"].added) == providers["QS"].fanout
+
+        # Empty everywhere is a consistent answer (e.g. a part without BOM), not a failure.
+        assert fan_out.compare_bom("PRT-1", base_env="PROD")["QS"].is_identical
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.db.providers import CIMDBProvider, CIMDBStubServer
+from utils.db.providers.cimdb_api import _HTTPConnectionPool
+
+BOM_ROWS = [{"child_id": f"PRT-{i:04d}", "pos_no": i * 10} for i in range(1, 1201)]
+ITEMS = {
+    "ASM-1": {"part_id": "ASM-1", "item_type": "ASSEMBLY", "tags": ["a", "b"]},
+    "PRT-0001": {"part_id": "PRT-0001", "item_type": "PART", "tags": []},
+}
+
+
+@pytest.fixture
+def server():
+    with CIMDBStubServer(items=ITEMS, boms={"ASM-1": BOM_ROWS},
+                         query_rows=[[1, "x"]], query_columns=["ID", "NAME"]) as stub:
+        yield stub
+
+
+@pytest.fixture
+def provider(server):
+    cimdb = CIMDBProvider(api_key=server.api_key, base_url=server.base_url,
+                          pool_size=2, max_parallel_pages=2, page_size=100)
+    yield cimdb
+    cimdb.disconnect()
+
+
+def test_connections_are_reused_within_pool_size(server, provider):
+    part_ids = ["ASM-1", "PRT-0001"] * 20
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(provider.get_item_details, part_ids))
+
+    assert [r["part_id"] for r in results] == part_ids
+    assert server.request_count == len(part_ids)
+    assert server.connection_count <= provider.pool_size
+
+
+def test_pages_are_returned_in_order(server, provider):
+    rows = provider.get_bom_first_level("ASM-1")
+
+    assert rows == BOM_ROWS
+    assert server.request_count == 12
+
+
+def test_unchanged_resource_is_served_from_etag_cache(server, provider):
+    first = provider.get_item_details("ASM-1")
+    second = provider.get_item_details("ASM-1")
+
+    assert first == second == ITEMS["ASM-1"]
+    assert server.not_modified_count == 1
+
+
+def test_cached_payload_is_not_shared_between_callers(server, provider):
+    first = provider.get_item_details("ASM-1")
+    first["tags"].append("mutated")
+    first["item_type"] = "MUTATED"
+
+    assert provider.get_item_details("ASM-1") == ITEMS["ASM-1"]
+    assert server.not_modified_count == 1
+
+
+def test_unknown_part_returns_empty_result(provider):
+    assert provider.get_item_details("DOES-NOT-EXIST") == {}
+    assert provider.get_bom_first_level("DOES-NOT-EXIST") == []
+
+
+def test_invalid_api_key_returns_empty_result(server):
+    cimdb = CIMDBProvider(api_key="wrong-key", base_url=server.base_url)
+    try:
+        assert cimdb.get_item_details("ASM-1") == {}
+        assert cimdb.get_bom_first_level("ASM-1") == []
+    finally:
+        cimdb.disconnect()
+
+
+def test_execute_query_returns_rows(provider):
+    assert provider.execute_query("SELECT id, name FROM items") == [[1, "x"]]
+
+
+def test_query_parameters_are_sent_separately(server, provider):
+    provider.execute_query("SELECT id, name FROM items WHERE id = :id", {"id": 1})
+
+    assert server.queries[-1] == {"query": "SELECT id, name FROM items WHERE id = :id", "params": {"id": 1}}
+
+
+def test_fetch_arrow_and_export_pass_parameters(server, provider, tmp_path):
+    pytest.importorskip("pyarrow")
+
+    table = provider.fetch_arrow("SELECT id, name FROM items WHERE id = :id", {"id": 1})
+    assert table.column_names == ["id", "name"]
+    assert table.to_pylist() == [{"id": 1, "name": "x"}]
+    assert server.queries[-1]["params"] == {"id": 1}
+
+    rows = provider.export_query("SELECT id FROM items WHERE id = ?", tmp_path / "items.parquet", params=[2])
+    assert rows == 1
+    assert (tmp_path / "items.parquet").exists()
+    assert server.queries[-1]["params"] == [2]
+
+
+def test_default_execute_many_counts_parameter_sets(server, provider):
+    assert provider.execute_many("UPDATE items SET name = :name", [{"name": "a"}, {"name": "b"}]) == 2
+    assert [query["params"] for query in server.queries] == [{"name": "a"}, {"name": "b"}]
+
+
+def test_paginated_requests_share_one_page_executor(provider):
+    provider.get_bom_first_level("ASM-1")
+    executor = provider._page_executor
+    provider.get_bom_first_level("ASM-1")
+
+    assert executor is not None and provider._page_executor is executor
+    provider.disconnect()
+    assert provider._page_executor is None
+
+
+class FakeResponse:
+    status = 200
+    will_close = False
+
+    def read(self):
+        return b"{}"
+
+    def getheaders(self):
+        return []
+
+
+class FakeConnection:
+    """Fails with `error` on its first request, like a keep-alive socket the server dropped."""
+
+    def __init__(self, sent, error=None):
+        self.sent = sent
+        self.error = error
+
+    def request(self, method, path, body=None, headers=None):
+        self.sent.append(method)
+
+    def getresponse(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+def make_pool(errors):
+    sent = []
+    pool = _HTTPConnectionPool("http://cimdb.invalid", maxsize=1)
+    connections = iter([FakeConnection(sent, error) for error in errors])
+    pool._new_connection = lambda: next(connections)
+    return pool, sent
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError(), BrokenPipeError()])
+def test_get_is_retried_once_on_a_stale_socket(error):
+    pool, sent = make_pool([error, None])
+
+    assert pool.request("GET", "/items/ASM-1")[0] == 200
+    assert sent == ["GET", "GET"]
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError(), BrokenPipeError()])
+def test_post_is_never_resent(error):
+    pool, sent = make_pool([error, None])
+
+    with pytest.raises(type(error)):
+        pool.request("POST", "/query", body=b"{}")
+    assert sent == ["POST"]
@@ -0,0 +1,93 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from utils.db.export import lists_to_arrow, lowercase_columns, rows_to_arrow, write_batches, write_table
+
+
+def read(path):
+    return pq.read_table(path) if path.suffix == ".parquet" else feather.read_table(path)
+
+
+def test_rows_to_arrow_keeps_dictionary_keys_as_columns():
+    table = rows_to_arrow([{"child_id": "A", "pos_no": 10}, {"child_id": "B", "pos_no": 20}])
+
+    assert table.column_names == ["child_id", "pos_no"]
+    assert table.to_pylist() == [{"child_id": "A", "pos_no": 10}, {"child_id": "B", "pos_no": 20}]
+
+
+def test_lists_to_arrow_maps_rows_to_named_columns():
+    table = lists_to_arrow([[1, "x"], [2, "y"]], ["ID", "NAME"])
+
+    assert lowercase_columns(table).to_pydict() == {"id": [1, 2], "name": ["x", "y"]}
+
+
+def test_lists_to_arrow_keeps_columns_of_an_empty_result():
+    table = lists_to_arrow([], ["id", "name"])
+
+    assert table.num_rows == 0
+    assert table.column_names == ["id", "name"]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather", ".arrow", ".ipc"])
+def test_write_table_picks_the_format_from_the_suffix(tmp_path, suffix):
+    table = pa.table({"id": [1, 2]})
+    target = write_table(table, tmp_path / "sub" / f"out{suffix}")
+
+    reader = pq.read_table if suffix == ".parquet" else feather.read_table
+    assert reader(target).equals(table)
+    assert sorted(p.name for p in target.parent.iterdir()) == [target.name]
+
+
+def test_write_table_explicit_format_overrides_suffix(tmp_path):
+    target = write_table(pa.table({"id": [1]}), tmp_path / "out.bin", file_format="feather")
+
+    assert feather.read_table(target).to_pydict() == {"id": [1]}
+
+
+def test_write_table_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported export format 'csv'"):
+        write_table(pa.table({"id": [1]}), tmp_path / "out.csv")
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_write_batches_streams_all_batches(tmp_path, suffix):
+    batches = [pa.table({"ID": [1, 2]}), pa.record_batch({"ID": [3]})]
+
+    assert write_batches(iter(batches), tmp_path / f"out{suffix}") == 3
+    assert read(tmp_path / f"out{suffix}").to_pydict() == {"id": [1, 2, 3]}
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_write_batches_writes_schema_of_an_empty_result(tmp_path, suffix):
+    empty = lambda: pa.table({"ID": pa.array([], type=pa.int64())})
+
+    assert write_batches(iter([]), tmp_path / f"out{suffix}", empty_table=empty) == 0
+    table = read(tmp_path / f"out{suffix}")
+    assert table.num_rows == 0
+    assert table.schema.names == ["id"]
+
+
+def test_write_batches_without_schema_raises_and_writes_nothing(tmp_path):
+    with pytest.raises(ValueError):
+        write_batches(iter([]), tmp_path / "out.parquet")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_failed_stream_leaves_no_truncated_file(tmp_path, suffix):
+    target = tmp_path / f"out{suffix}"
+    write_table(pa.table({"id": [42]}), target)
+
+    def failing_batches():
+        yield pa.table({"id": [1, 2]})
+        raise ConnectionError("lost connection while fetching")
+
+    with pytest.raises(ConnectionError):
+        write_batches(failing_batches(), target)
+
+    # The previous export is untouched and no temporary file is left behind.
+    assert read(target).to_pydict() == {"id": [42]}
+    assert [p.name for p in tmp_path.iterdir()] == [target.name]
@@ -0,0 +1,87 @@
+import os
+import stat
+
+import pytest
+
+from utils.ai import HistoryManager, HistoryWriter
+
+
+def message(text):
+    return {"role": "user", "content": text}
+
+
+def test_submits_are_coalesced_per_session(tmp_path):
+    manager = HistoryManager(storage_dir=str(tmp_path), provider_type="mock")
+    writer = HistoryWriter(manager, flush_interval=60)
+    try:
+        writer.submit("a", [message("1")])
+        writer.submit("a", [message("1"), message("2")])
+        writer.submit("b", [message("x")])
+    finally:
+        writer.close()
+
+    assert manager.load_history("a") == [message("1"), message("2")]
+    assert manager.load_history("b") == [message("x")]
+    assert writer.stats["coalesced"] == 1
+    assert writer.stats["written"] == 2
+
+
+def test_one_writer_serves_several_history_managers(tmp_path):
+    first = HistoryManager(storage_dir=str(tmp_path / "first"), provider_type="mock")
+    second = HistoryManager(storage_dir=str(tmp_path / "second"), provider_type="mock")
+    writer = HistoryWriter(flush_interval=60)
+    try:
+        writer.submit("same-session", [message("first")], first)
+        writer.submit("same-session", [message("second")], second)
+        with pytest.raises(ValueError):
+            writer.submit("same-session", [message("nowhere")])
+    finally:
+        writer.close()
+
+    assert first.load_history("same-session") == [message("first")]
+    assert second.load_history("same-session") == [message("second")]
+
+
+def test_default_writer_is_shared_and_restarted_after_close():
+    writer = HistoryWriter.default()
+    assert HistoryWriter.default() is writer
+
+    writer.close()
+    restarted = HistoryWriter.default()
+    assert restarted is not writer
+    restarted.close()
+
+
+def test_submit_after_close_writes_synchronously(tmp_path):
+    manager = HistoryManager(storage_dir=str(tmp_path), provider_type="mock")
+    writer = HistoryWriter(manager)
+    writer.close()
+
+    writer.submit("late", [message("still saved")])
+
+    assert manager.load_history("late") == [message("still saved")]
+
+
+def test_failed_writes_are_counted_separately(tmp_path):
+    manager = HistoryManager(storage_dir=str(tmp_path), provider_type="mock")
+    writer = HistoryWriter(manager, flush_interval=60)
+    try:
+        writer.submit("ok", [message("fine")])
+        writer.submit("broken", [{"role": "user", "content": object()}])  # not JSON serializable
+        assert writer.flush() == 1
+    finally:
+        writer.close()
+
+    assert (writer.stats["written"], writer.stats["failed"]) == (1, 1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ok.json"]
+
+
+def test_history_files_get_default_permissions(tmp_path):
+    manager = HistoryManager(storage_dir=str(tmp_path), provider_type="mock")
+    umask = os.umask(0o022)
+    try:
+        assert manager.save_history("perm", [message("x")])
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE((tmp_path / "perm.json").stat().st_mode) == 0o644
@@ -0,0 +1,124 @@
+import time
+
+from utils.db import PrefetchingProvider, SharedBOMCache
+from utils.db.providers import FakeDBProvider
+
+
+class FlakyProvider(FakeDBProvider):
+    """Swallows errors like the real providers: a failed BOM lookup returns []."""
+
+    def __init__(self, failing=(), **kwargs):
+        super().__init__(latency=0, jitter=0, **kwargs)
+        self.failing = set(failing)
+
+    def get_bom_first_level(self, parent_part_id):
+        if parent_part_id in self.failing:
+            self._wait()
+            return []
+        return super().get_bom_first_level(parent_part_id)
+
+
+def wait_idle(prefetching, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while prefetching._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_cache_entry_expires_after_its_own_ttl():
+    cache = SharedBOMCache(ttl=60)
+    cache.put("long", [1])
+    cache.put("short", [2], ttl=0.01)
+    time.sleep(0.05)
+
+    assert cache.get("long") == [1]
+    assert cache.get("short") is None
+
+
+def test_children_are_prefetched_into_the_cache():
+    provider = FakeDBProvider(latency=0, jitter=0, fanout=3)
+    prefetching = PrefetchingProvider(provider, max_workers=1)
+    children = prefetching.get_bom_first_level("ASM-1")
+    wait_idle(prefetching)
+    prefetching.close()
+
+    assert prefetching.stats["prefetched"] == 3
+    queries = provider.query_count
+    assert prefetching.get_bom_first_level(children[0]["child_id"])
+    assert provider.query_count == queries
+
+
+def test_background_prefetch_does_not_cache_empty_levels():
+    background = FlakyProvider(failing={"ASM-1.1"}, fanout=2)
+    prefetching = PrefetchingProvider(FakeDBProvider(latency=0, jitter=0, fanout=2),
+                                      background_provider=background, max_workers=1)
+    prefetching.get_bom_first_level("ASM-1")
+    wait_idle(prefetching)
+    prefetching.close()
+
+    assert ("", "bom", "ASM-1.1") not in prefetching.cache
+    assert ("", "bom", "ASM-1.2") in prefetching.cache
+    assert prefetching.stats["prefetched"] == 1
+
+
+def test_empty_foreground_level_is_cached_only_briefly():
+    provider = FlakyProvider(failing={"ASM-1"})
+    prefetching = PrefetchingProvider(provider, depth=0, empty_ttl=0.05)
+    try:
+        assert prefetching.get_bom_first_level("ASM-1") == []
+        assert prefetching.get_bom_first_level("ASM-1") == []
+        assert provider.query_count == 1
+
+        provider.failing.clear()
+        time.sleep(0.1)
+        assert prefetching.get_bom_first_level("ASM-1")
+        assert provider.query_count == 2
+    finally:
+        prefetching.close()
+
+
+def test_arrow_methods_are_forwarded_with_their_options(tmp_path):
+    calls = []
+
+    class ArrowProvider(FakeDBProvider):
+        def fetch_arrow(self, query, params=None, arraysize=1000):
+            calls.append(("fetch_arrow", params, arraysize))
+
+        def get_bom_first_level_arrow(self, parent_id):
+            calls.append(("get_bom_first_level_arrow", parent_id))
+
+        def export_query(self, query, path, file_format=None, params=None, batch_size=50000):
+            calls.append(("export_query", params, batch_size))
+
+    prefetching = PrefetchingProvider(ArrowProvider(latency=0, jitter=0))
+    try:
+        prefetching.fetch_arrow("SELECT 1", {"id": 1}, arraysize=10)
+        prefetching.get_bom_first_level_arrow("ASM-1")
+        prefetching.export_query("SELECT 1", tmp_path / "out.parquet", params={"id": 1}, batch_size=5)
+    finally:
+        prefetching.close()
+
+    assert calls == [
+        ("fetch_arrow", {"id": 1}, 10),
+        ("get_bom_first_level_arrow", "ASM-1"),
+        ("export_query", {"id": 1}, 5),
+    ]
+
+
+def test_results_are_copies_of_the_shared_cache():
+    cache = SharedBOMCache()
+    session_a = PrefetchingProvider(FakeDBProvider(latency=0, jitter=0), cache=cache, depth=0)
+    session_b = PrefetchingProvider(FakeDBProvider(latency=0, jitter=0), cache=cache, depth=0)
+    try:
+        rows = session_a.get_bom_first_level("ASM-1")
+        expected = [dict(row) for row in rows]
+        rows[0]["child_id"] = "MUTATED"
+        rows.clear()
+        item = session_a.get_item_details("ASM-1")
+        item["item_type"] = "MUTATED"
+
+        assert session_b.get_bom_first_level("ASM-1") == expected
+        assert session_b.get_item_details("ASM-1")["item_type"] == "ASSEMBLY"
+        assert session_b.stats["hits"] == 2
+    finally:
+        session_a.close()
+        session_b.close()
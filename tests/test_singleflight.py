@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import SingleFlight
+
+
+def test_make_key_normalizes_equivalent_calls():
+    assert SingleFlight.make_key("get", " 4711 ", env="PROD") == SingleFlight.make_key("get", "4711", env="PROD")
+    assert SingleFlight.make_key("get", {"b": 2, "a": [1]}) == SingleFlight.make_key("get", {"a": [1], "b": 2})
+    assert SingleFlight.make_key("get", "4711") != SingleFlight.make_key("get", "4712")
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flights.do, "key", slow, 21)
+        started.wait(5)
+        waiters = [executor.submit(flights.do, "key", slow, 21) for _ in range(4)]
+        while flights.stats["shared"] < 4:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert results == [42] * 5
+    assert calls == [21]
+    assert flights.stats == {"executions": 1, "shared": 4, "timeouts": 0}
+
+
+def test_sequential_calls_are_not_cached():
+    flights = SingleFlight()
+    counter = iter(range(10))
+
+    assert flights.do("key", lambda: next(counter)) == 0
+    assert flights.do("key", lambda: next(counter)) == 1
+
+
+def test_error_is_raised_to_every_caller_and_not_remembered():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", failing)
+        started.wait(5)
+        waiter = executor.submit(flights.do, "key", failing)
+        while flights.stats["shared"] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+    assert flights.do("key", lambda: "ok") == "ok"
+
+
+def test_waiter_timeout_does_not_interrupt_leader():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(flights.do, "key", slow)
+        started.wait(5)
+        with pytest.raises(TimeoutError):
+            flights.do("key", slow, timeout=0.05)
+        release.set()
+        assert leader.result() == "done"
+
+    assert flights.stats["timeouts"] == 1
+
+
+def test_async_tasks_share_one_coroutine_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", fetch, "x") for _ in range(5)))
+
+    assert asyncio.run(main()) == ["x"] * 5
+    assert calls == ["x"]
+
+
+def test_cancelling_the_async_leader_does_not_fail_waiters():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do_async("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flights.do_async("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "result"
+    assert calls == [1]
+    assert not flights._async_calls
+
+
+def test_async_error_reaches_every_task():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [ValueError] * 3
+    assert flights.stats["executions"] == 1
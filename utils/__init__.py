@@ -1,2 +1,3 @@
 from .logger import Logger
-__all__ = ['Logger']
\ No newline at end of file
+from .singleflight import SingleFlight
+__all__ = ['Logger', 'SingleFlight']
\ No newline at end of file
@@ -1,6 +1,7 @@
 from .prompt_loader import PromptLoader
 from .history_manager import HistoryManager
+from .history_writer import HistoryWriter
 from .model_interface import AIModelInterface
-from .model_provider import GeminiProvider, MockProvider, GPTProvider
+from .model_provider import GeminiProvider, MockProvider, GPTProvider, LatencyMockProvider, CoalescingProvider
 
-__all__ = ["PromptLoader", "HistoryManager", "AIModelInterface", "GeminiProvider", "MockProvider", "GPTProvider"]
\ No newline at end of file
+__all__ = ["PromptLoader", "HistoryManager", "HistoryWriter", "AIModelInterface", "GeminiProvider", "MockProvider", "GPTProvider", "LatencyMockProvider", "CoalescingProvider"]
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import json
+import uuid
 from pathlib import Path
 from google.genai import types
 from utils.logger import Logger
@@ -64,28 +65,53 @@ class HistoryManager:
             log.error(f"Error loading history for session {session_id}: {e}")
             return []
 
-    def save_history(self, session_id: str, history):
+    def to_neutral(self, history) -> list:
+        """Maps provider-specific message objects to the neutral {'role', 'content'} format."""
+        neutral_history = []
+        for msg in history:
+            if hasattr(msg, 'model_dump'):
+                dump = msg.model_dump(exclude_none=True)
+                role = "assistant" if dump.get("role") == "model" else dump.get("role", "user")
+                content = dump.get("parts")[0].get("text", "") if dump.get("parts") else ""
+                neutral_history.append({"role": role, "content": content})
+            else:
+                neutral_history.append(msg)
+        return neutral_history
+
+    def _write_atomic(self, path: Path, data) -> None:
+        """Writes JSON to a temporary file in the same directory and renames it over the target.
+
+        os.replace is atomic, so a crash during the write leaves the previous
+        history intact instead of a truncated file. The temporary file is created with
+        the default permissions (0666 minus umask), like a file opened with open().
+        """
+        tmp_path = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save_history(self, session_id: str, history) -> bool:
         """Serializes the current conversation history to disk.
 
         Args:
             history (list): A list of types.Content objects to save.
+        Returns:
+            bool: True if the history was written, False if the error was logged instead.
         """
         path = self._get_path(session_id)
 
         try:
-            neutral_history = []
-            for msg in history:
-                if hasattr(msg, 'model_dump'):
-                    dump = msg.model_dump(exclude_none=True)
-                    role = "assistant" if dump.get("role") == "model" else dump.get("role", "user")
-                    content = dump.get("parts")[0].get("text", "") if dump.get("parts") else ""
-                    neutral_history.append({"role": role, "content": content})
-                else:
-                    neutral_history.append(msg)
-            
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(neutral_history, f, indent=4)
-
+            self._write_atomic(path, self.to_neutral(history))
             log.debug(f"History for session {session_id} saved to {path}")
+            return True
         except Exception as e:
-            log.error(f"Error saving history for session {session_id}: {str(e)}")
\ No newline at end of file
+            log.error(f"Error saving history for session {session_id}: {str(e)}")
+            return False
\ No newline at end of file
@@ -0,0 +1,168 @@
+import atexit
+import threading
+import time
+from typing import ClassVar, Dict, Optional, Tuple
+from utils.ai.history_manager import HistoryManager
+from utils.logger import Logger
+
+log = Logger("HistoryWriter")
+
+
+class HistoryWriter:
+    """Write-behind persistence of chat histories on a background thread.
+
+    `submit()` only stores a snapshot of the history and returns immediately, so the
+    chatbot can hand the reply to the user without waiting for serialization and disk
+    I/O. A worker thread flushes pending snapshots every `flush_interval` seconds;
+    several submits for the same session within one interval are coalesced into a
+    single write of the newest snapshot. Pending data is flushed on `close()` and at
+    interpreter exit. Files are written by HistoryManager with an atomic rename.
+
+    Every writer owns a thread, so a process should share as few as possible: use
+    `HistoryWriter.default()` unless a separately configured writer is needed.
+
+    Attributes:
+        history_manager (HistoryManager): Writes submissions that do not name their own manager.
+        flush_interval (float): Maximum delay in seconds before a submitted history is written.
+    """
+
+    _default: ClassVar[Optional["HistoryWriter"]] = None
+    _default_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, history_manager: Optional[HistoryManager] = None, flush_interval: float = 1.0):
+        """Starts the background worker.
+
+        Args:
+            history_manager (HistoryManager): The manager used to write histories. If omitted,
+                every submit() must pass its own manager.
+            flush_interval (float): Coalescing window in seconds. Defaults to 1.0.
+        """
+        self.history_manager = history_manager
+        self.flush_interval = flush_interval
+
+        # (history manager, session id) -> newest snapshot
+        self._pending: Dict[Tuple[HistoryManager, str], list] = {}
+        self._cond = threading.Condition()
+        # Serializes flushes so an older snapshot can never overwrite a newer one.
+        self._write_lock = threading.Lock()
+        self._stopping = False
+
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "written": 0,
+            "failed": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        log.info(f"HistoryWriter started (flush interval {self.flush_interval:.2f}s).")
+
+    @classmethod
+    def default(cls) -> "HistoryWriter":
+        """Returns the process-wide writer shared by all chatbots, starting it on first use.
+
+        The shared writer has no HistoryManager of its own, so submissions must name
+        theirs. It is closed at interpreter exit; a new one is started if it was
+        closed earlier.
+        """
+        with cls._default_lock:
+            if cls._default is None or cls._default._stopping:
+                cls._default = cls()
+            return cls._default
+
+    def submit(self, session_id: str, history: list, history_manager: Optional[HistoryManager] = None) -> None:
+        """Queues the current history of a session for persistence and returns immediately.
+
+        Args:
+            session_id (str): The session the history belongs to.
+            history (list): The full conversation history. A shallow copy is taken,
+                so the caller may keep appending to its list.
+            history_manager (HistoryManager): Writes this history. Defaults to the writer's own manager.
+        Raises:
+            ValueError: If neither the writer nor the call provides a HistoryManager.
+        """
+        manager = history_manager or self.history_manager
+        if manager is None:
+            raise ValueError("HistoryWriter.submit() needs a history_manager, the writer has none of its own.")
+
+        snapshot = list(history)
+        key = (manager, session_id)
+        with self._cond:
+            if self._stopping:
+                log.warning(f"HistoryWriter is closed, saving session {session_id} synchronously.")
+            else:
+                if key in self._pending:
+                    self.stats["coalesced"] += 1
+                self._pending[key] = snapshot
+                self.stats["submitted"] += 1
+                self._cond.notify()
+                return
+        manager.save_history(session_id, snapshot)
+
+    def flush(self) -> int:
+        """Writes all pending histories now, on the calling thread.
+
+        Returns:
+            int: The number of sessions written successfully. Failed writes are logged
+            by the HistoryManager and counted in stats['failed'].
+        """
+        with self._write_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            written = sum(1 for (manager, session_id), history in batch.items()
+                          if manager.save_history(session_id, history))
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        failed = len(batch) - written
+        with self._cond:
+            self.stats["written"] += written
+            self.stats["failed"] += failed
+            self.stats["flushes"] += 1
+            # Flush latency describes successful writes only; failing writes return early.
+            if written:
+                self.stats["last_flush_ms"] = latency_ms
+                self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], latency_ms)
+        if failed:
+            log.warning(f"Flush finished with {failed} of {len(batch)} session(s) not written.")
+        log.debug(f"Flushed {written} session(s) in {latency_ms:.1f} ms")
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping:
+                    return
+                # Coalescing window: gather further submits until the interval elapses.
+                self._cond.wait_for(lambda: self._stopping, timeout=self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                log.error(f"Error in history write-behind worker: {e}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stops the worker and writes everything that is still pending.
+
+        Callers that create their own writer must call this when done with it: the
+        exit hook only flushes at interpreter shutdown, it keeps the writer and its
+        thread alive until then.
+        """
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        self.flush()
+        atexit.unregister(self.close)
+        log.info(f"HistoryWriter closed. Stats: {self.stats}")
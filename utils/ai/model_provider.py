@@ -1,9 +1,16 @@
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Optional
 from google import genai
 from google.genai import types
 from openai import OpenAI
 from openai.types.chat import ChatCompletionMessageParam
 from .model_interface import AIModelInterface
 from utils.logger import Logger
+from utils.singleflight import SingleFlight
 
 log = Logger("ModelProvider")
 
@@ -103,4 +110,67 @@ class MockProvider(AIModelInterface):
         return "Boss, this is a simulated response. The interface works perfectly!"
     
     def get_type(self) -> str:
-        return "mock"
\ No newline at end of file
+        return "mock"
+
+class LatencyMockProvider(MockProvider):
+    """Mock provider that simulates the response time of a real model, for load tests.
+
+    Each call blocks for `latency` seconds plus up to `jitter` seconds, the way a
+    thread waits on a remote API.
+    """
+    def __init__(self, model_name="mock-model", latency: float = 1.0, jitter: float = 0.5, seed: Optional[int] = None):
+        super().__init__(model_name=model_name)
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, system_instruction: str, messages: list) -> str:
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        time.sleep(delay)
+        return f"Boss, this is a simulated response after {delay:.2f}s to message #{len(messages)}."
+
+
+class CoalescingProvider(AIModelInterface):
+    """Wraps another provider and deduplicates identical concurrent generate() calls.
+
+    Two calls are identical when the system instruction and the full message history
+    are equal. While one of them is being answered, the others wait for and receive
+    the same response instead of issuing their own API request.
+
+    This is an opt-in building block and GuiliaChatbot does not wrap its model by
+    default. A chat turn rarely coalesces: the Giulia system prompt carries the current
+    time and every session sends its own history. It pays off for stateless calls with
+    a fixed instruction (e.g. the same summary or classification prompt requested by
+    many sessions at once) and for duplicate submits of one session's turn.
+    """
+    def __init__(self, provider: AIModelInterface, timeout: Optional[float] = None):
+        self.provider = provider
+        self.timeout = timeout
+        self.flights = SingleFlight(name=f"{provider.get_type()}-provider")
+        log.info(f"CoalescingProvider initialized around {type(provider).__name__}")
+
+    def __getattr__(self, name):
+        # Expose attributes of the wrapped provider (e.g. model_name) to the caller.
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    @staticmethod
+    def _request_key(system_instruction: str, messages: list) -> str:
+        neutral = [msg.model_dump(exclude_none=True) if hasattr(msg, "model_dump") else msg for msg in messages]
+        payload = json.dumps([system_instruction, neutral], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate(self, system_instruction: str, messages: list) -> str:
+        key = self._request_key(system_instruction, messages)
+        return self.flights.do(key, self.provider.generate, system_instruction, list(messages), timeout=self.timeout)
+
+    async def generate_async(self, system_instruction: str, messages: list) -> str:
+        """Async variant of generate(); shares in-flight calls with threaded callers."""
+        key = self._request_key(system_instruction, messages)
+        return await self.flights.do_async(key, self.provider.generate, system_instruction, list(messages), timeout=self.timeout)
+
+    def get_type(self) -> str:
+        return self.provider.get_type()
\ No newline at end of file
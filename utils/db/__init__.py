@@ -1,5 +1,8 @@
-from .interface import DBInterface
+from .interface import DBInterface, BindParams
 from .credentials import CredentialManager
 from .factory import DBFactory
+from .bom_diff import BOMDiff, diff_bom
+from .fanout import EnvironmentFanOut
+from .prefetch import PrefetchingProvider, SharedBOMCache
     
-__all__ = ["DBInterface", "CredentialManager", "DBFactory"]
\ No newline at end of file
+__all__ = ["DBInterface", "BindParams", "CredentialManager", "DBFactory", "BOMDiff", "diff_bom", "EnvironmentFanOut", "PrefetchingProvider", "SharedBOMCache"]
\ No newline at end of file
@@ -0,0 +1,116 @@
+from numbers import Number
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from utils.logger import Logger
+
+log = Logger("BOMDiff")
+
+# Fields that identify a BOM line and fields whose changes are reported.
+DEFAULT_KEY_FIELDS = ("pos_no",)
+DEFAULT_COMPARE_FIELDS = ("child_id", "item_type", "lev_ind", "chk_name", "cur_flag")
+
+
+class BOMDiff:
+    """Result of comparing two first-level BOMs.
+
+    Attributes:
+        added (list): Rows present only on the right side.
+        removed (list): Rows present only on the left side.
+        changed (list): Tuples of (key, left_row, right_row, changed_fields) for lines
+            present on both sides whose compared fields differ.
+        unchanged_count (int): Number of lines that are identical on both sides.
+    """
+
+    def __init__(self):
+        self.added: List[Dict[str, Any]] = []
+        self.removed: List[Dict[str, Any]] = []
+        self.changed: List[Tuple[Hashable, Dict[str, Any], Dict[str, Any], List[str]]] = []
+        self.unchanged_count = 0
+
+    @property
+    def is_identical(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed, {self.unchanged_count} unchanged")
+
+    def __repr__(self) -> str:
+        return f"BOMDiff({self.summary()})"
+
+
+def _sortable(value: Any) -> Tuple[int, Any]:
+    """Orders numbers numerically and everything else by its string form."""
+    if isinstance(value, Number) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+
+def _index_rows(rows: Iterable[Dict[str, Any]], key_fields: Sequence[str],
+                compare_fields: Sequence[str]) -> Dict[Hashable, Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """Builds {line key: (fingerprint, row)}.
+
+    The fingerprint is the tuple of compared values, so equality checks are a single
+    hashed tuple comparison. Repeated keys (e.g. the same position used twice) get an
+    occurrence counter appended so no line is silently dropped.
+    """
+    index: Dict[Hashable, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+    occurrences: Dict[Tuple[Any, ...], int] = {}
+
+    for row in rows:
+        base_key = tuple(map(row.get, key_fields))
+        occurrence = occurrences.get(base_key, 0)
+        occurrences[base_key] = occurrence + 1
+
+        key = base_key + (occurrence,)
+        index[key] = (tuple(map(row.get, compare_fields)), row)
+
+    return index
+
+
+def diff_bom(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]],
+             key_fields: Sequence[str] = DEFAULT_KEY_FIELDS,
+             compare_fields: Optional[Sequence[str]] = None) -> BOMDiff:
+    """Compares two first-level BOMs (as returned by get_bom_first_level) line by line.
+
+    Lines are matched by `key_fields` (the BOM position by default) using hash based
+    set operations, so the comparison runs in linear time even for assemblies with
+    tens of thousands of lines.
+
+    Args:
+        left: BOM rows of the reference side (e.g. PROD).
+        right: BOM rows of the compared side (e.g. QS).
+        key_fields: Fields identifying a BOM line. Use ("pos_no", "child_id") to treat
+            a part swap on the same position as removal plus addition.
+        compare_fields: Fields whose differences mark a line as changed. Defaults to
+            the columns returned by get_bom_first_level.
+    Returns:
+        BOMDiff: The added, removed and changed lines.
+    """
+    fields = tuple(compare_fields) if compare_fields is not None else DEFAULT_COMPARE_FIELDS
+    left_index = _index_rows(left, key_fields, fields)
+    right_index = _index_rows(right, key_fields, fields)
+
+    left_keys = left_index.keys()
+    right_keys = right_index.keys()
+
+    result = BOMDiff()
+    result.removed = [left_index[key][1] for key in left_keys - right_keys]
+    result.added = [right_index[key][1] for key in right_keys - left_keys]
+
+    for key in left_keys & right_keys:
+        left_print, left_row = left_index[key]
+        right_print, right_row = right_index[key]
+        if left_print == right_print:
+            result.unchanged_count += 1
+            continue
+        changed_fields = [field for field, a, b in zip(fields, left_print, right_print) if a != b]
+        result.changed.append((key[:-1], left_row, right_row, changed_fields))
+
+    # Set operations do not preserve order; report in a stable, readable order.
+    sort_key = lambda row: tuple(_sortable(row.get(field)) for field in key_fields)
+    result.removed.sort(key=sort_key)
+    result.added.sort(key=sort_key)
+    result.changed.sort(key=lambda entry: sort_key(entry[1]))
+
+    log.debug(f"BOM diff computed: {result.summary()}")
+    return result
@@ -35,4 +35,25 @@ class CredentialManager:
             raise ValueError(error_msg)
 
         log.info(f"Credentials for {env} successfully loaded.")
+        return credentials # type: ignore (Pylance safe, as we validated None values)
+
+    def get_api_credentials(self, env: str) -> Dict[str, str]:
+        """
+        Returns a dictionary with api_key and base_url for REST based systems (CIMDB).
+        Expects keys like PROD_CIMDB_API_KEY, PROD_CIMDB_URL in .env
+        """
+        env = env.upper()
+
+        credentials = {
+            "api_key": os.getenv(f"{env}_CIMDB_API_KEY"),
+            "base_url": os.getenv(f"{env}_CIMDB_URL")
+        }
+
+        missing = [key for key, value in credentials.items() if not value]
+        if missing:
+            error_msg = f"Missing CIMDB credentials for environment {env}: {', '.join(missing)}"
+            log.error(error_msg)
+            raise ValueError(error_msg)
+
+        log.info(f"CIMDB credentials for {env} successfully loaded.")
         return credentials # type: ignore (Pylance safe, as we validated None values)
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from utils.logger import Logger
+
+log = Logger("ColumnarExport")
+
+SUPPORTED_FORMATS = ("parquet", "feather")
+
+
+def require_pyarrow():
+    """Imports pyarrow on demand, as it is an optional dependency (install with the 'export' extra).
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Columnar export requires pyarrow. Install it with: uv sync --extra export") from e
+    return pyarrow
+
+
+def _resolve_format(path: Path, file_format: Optional[str]) -> str:
+    resolved = (file_format or path.suffix.lstrip(".")).lower()
+    if resolved in ("arrow", "ipc"):
+        resolved = "feather"
+    if resolved not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported export format '{resolved}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+    return resolved
+
+
+@contextmanager
+def _atomic_target(target: Path) -> Iterator[Path]:
+    """Yields a temporary path next to `target` and renames it over `target` on success.
+
+    os.replace is atomic, so a failed export leaves no truncated file behind and an
+    existing file at `target` stays intact. The temporary file is removed on error.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, target)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def rows_to_arrow(rows: Sequence[Dict[str, Any]]):
+    """Converts a list of row dictionaries (e.g. from get_bom_first_level) into a pyarrow.Table."""
+    pa = require_pyarrow()
+    return pa.Table.from_pylist(list(rows))
+
+
+def lists_to_arrow(rows: Sequence[Sequence[Any]], columns: List[str]):
+    """Converts a list of row lists (e.g. from execute_query) into a pyarrow.Table with the given column names."""
+    pa = require_pyarrow()
+    if not rows:
+        return pa.table({name: pa.array([], type=pa.null()) for name in columns})
+    return pa.table({name: list(values) for name, values in zip(columns, zip(*rows))})
+
+
+def lowercase_columns(table):
+    """Renames all columns to lower case, matching the dictionary keys returned by the providers."""
+    return table.rename_columns([str(name).lower() for name in table.column_names])
+
+
+def _write_file(table, path: Path, resolved: str, compression: str) -> None:
+    if resolved == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression=compression)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression=compression)
+
+
+def write_table(table, path: Union[str, Path], file_format: Optional[str] = None,
+                compression: str = "zstd") -> Path:
+    """Writes a pyarrow.Table to a Parquet or Feather (Arrow IPC) file.
+
+    Args:
+        table: The pyarrow.Table to write.
+        path: Target file. The format is taken from the suffix unless given explicitly.
+        file_format (str): 'parquet' or 'feather'.
+        compression (str): Compression codec used for both formats.
+    Returns:
+        Path: The written file.
+    """
+    target = Path(path)
+    resolved = _resolve_format(target, file_format)
+
+    with _atomic_target(target) as tmp_path:
+        _write_file(table, tmp_path, resolved, compression)
+
+    log.info(f"Exported {table.num_rows} rows ({table.nbytes / 1024:.1f} KiB in memory) to {target}")
+    return target
+
+
+def write_batches(batches: Iterable[Any], path: Union[str, Path], file_format: Optional[str] = None,
+                  compression: str = "zstd", empty_table: Optional[Callable[[], Any]] = None) -> int:
+    """Streams Arrow record batches (or tables) into a Parquet or Feather file.
+
+    Only one batch is held in memory at a time, which keeps large extracts bounded.
+    The schema is taken from the first batch. The file is written under a temporary
+    name and only moved to `path` once all batches were written, so an error while
+    fetching never leaves a truncated file behind.
+
+    Args:
+        empty_table: Called when `batches` yields nothing; must return an empty table
+            carrying the result schema, which is then written so the target file always exists.
+    Returns:
+        int: The number of rows written.
+    Raises:
+        ValueError: If `batches` is empty and no `empty_table` callback is given.
+    """
+    pa = require_pyarrow()
+    target = Path(path)
+    resolved = _resolve_format(target, file_format)
+
+    writer = None
+    total_rows = 0
+    with _atomic_target(target) as tmp_path:
+        try:
+            for batch in batches:
+                table = lowercase_columns(pa.table(batch))
+                if writer is None:
+                    if resolved == "parquet":
+                        import pyarrow.parquet as pq
+                        writer = pq.ParquetWriter(tmp_path, table.schema, compression=compression)
+                    else:
+                        writer = pa.ipc.new_file(tmp_path, table.schema,
+                                                 options=pa.ipc.IpcWriteOptions(compression=compression))
+                writer.write_table(table)
+                total_rows += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            if empty_table is None:
+                raise ValueError(f"No batches to export and no schema available, {target} was not written.")
+            _write_file(lowercase_columns(pa.table(empty_table())), tmp_path, resolved, compression)
+
+    log.info(f"Exported {total_rows} rows to {target}")
+    return total_rows
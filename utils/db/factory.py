@@ -1,9 +1,13 @@
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 from utils.db.interface import DBInterface
 from utils.db.providers import AgileE6Provider, CIMDBProvider
 from utils.db.credentials import CredentialManager
 from utils.logger import Logger
 
+if TYPE_CHECKING:
+    from utils.db.fanout import EnvironmentFanOut
+    from utils.db.prefetch import PrefetchingProvider, SharedBOMCache
+
 log = Logger("DBFactory")
 
 class DBFactory:
@@ -20,9 +24,8 @@ class DBFactory:
             env: The environment (e.g., 'PROD', 'QS', 'PQE', 'BLD')
             system_type: The type of PLM system (default: 'AGILE_E6')
         """
-        # 1. Zugangsdaten über den CredentialManager holen
+        # 1. Zugangsdaten werden je System über den CredentialManager geholt
         cm = CredentialManager()
-        creds = cm.get_credentials(env)
         
         log.info(f"Creating provider for {system_type} in {env} environment.")
 
@@ -30,6 +33,7 @@ class DBFactory:
         if system_type.upper() == "AGILE_E6":
             # Local Import, um Abhängigkeiten sauber zu halten
             from utils.db.providers.agile_e6_sql import AgileE6Provider
+            creds = cm.get_credentials(env)
             
             return AgileE6Provider(
                 user=creds["user"],
@@ -38,9 +42,49 @@ class DBFactory:
             )
             
         elif system_type.upper() == "CIMDB":
-            raise NotImplementedError("CIMDBProvider is not yet fully implemented.")
+            from utils.db.providers.cimdb_api import CIMDBProvider
+            creds = cm.get_api_credentials(env)
+
+            return CIMDBProvider(
+                api_key=creds["api_key"],
+                base_url=creds["base_url"]
+            )
 
         else:
             error_msg = f"Unknown system type: {system_type}"
             log.error(error_msg)
-            raise ValueError(error_msg)
\ No newline at end of file
+            raise ValueError(error_msg)
+
+    @staticmethod
+    def get_fan_out(envs: List[str], system_type: str = "AGILE_E6") -> "EnvironmentFanOut":
+        """
+        Returns a fan-out that runs the same query against several environments concurrently.
+        
+        Args:
+            envs: The environments to query (e.g. ['PROD', 'QS'])
+            system_type: The type of PLM system (default: 'AGILE_E6')
+        """
+        from utils.db.fanout import EnvironmentFanOut
+        return EnvironmentFanOut(envs, system_type=system_type)
+
+    @staticmethod
+    def get_prefetching_provider(env: str, system_type: str = "AGILE_E6",
+                                 cache: Optional["SharedBOMCache"] = None, **options) -> "PrefetchingProvider":
+        """
+        Returns a provider that warms the next BOM level(s) in the background after each BOM request.
+        Prefetch queries run on a second provider (own connection), so they never block foreground queries.
+        
+        Args:
+            env: The environment (e.g., 'PROD', 'QS', 'PQE', 'BLD')
+            system_type: The type of PLM system (default: 'AGILE_E6')
+            cache: Optional cache shared with other sessions
+            **options: Budget options passed to PrefetchingProvider (depth, max_children, ...)
+        """
+        from utils.db.prefetch import PrefetchingProvider
+        return PrefetchingProvider(
+            DBFactory.get_provider(env, system_type),
+            cache=cache,
+            background_provider=DBFactory.get_provider(env, system_type),
+            cache_namespace=f"{system_type.upper()}:{env.upper()}",
+            **options
+        )
\ No newline at end of file
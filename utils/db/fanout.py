@@ -0,0 +1,159 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from utils.db.interface import DBInterface
+from utils.db.bom_diff import BOMDiff, diff_bom
+from utils.logger import Logger
+
+log = Logger("EnvironmentFanOut")
+
+
+class EnvironmentFanOut:
+    """Runs the same DBInterface call against several environments concurrently.
+
+    Every environment gets its own provider (and therefore its own connection or
+    connection pool), created lazily through the DBFactory and reused across calls.
+    A thread pool with one worker per environment executes the calls in parallel,
+    so the total latency is that of the slowest environment instead of the sum.
+
+    Usage:
+        with EnvironmentFanOut(["PROD", "QS"]) as fan_out:
+            results, errors = fan_out.run("get_item_details", "4711")
+            diffs = fan_out.compare_bom("4711", base_env="PROD")
+    """
+
+    def __init__(self, envs: Iterable[str], system_type: str = "AGILE_E6",
+                 providers: Optional[Dict[str, DBInterface]] = None):
+        """Sets up the fan-out for the given environments.
+        Args:
+            envs: The environments to query (e.g. ['PROD', 'QS', 'PQE', 'BLD']).
+            system_type (str): The PLM system type passed to the DBFactory.
+            providers (dict): Optional pre-built providers keyed by environment,
+                e.g. for tests. Missing environments are created via the DBFactory.
+        """
+        self.envs = [env.upper() for env in envs]
+        if not self.envs:
+            raise ValueError("At least one environment is required for a fan-out.")
+
+        self.system_type = system_type
+        self._providers: Dict[str, DBInterface] = {k.upper(): v for k, v in (providers or {}).items()}
+        self._providers_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.envs), thread_name_prefix="env-fanout")
+        log.info(f"EnvironmentFanOut initialized for {', '.join(self.envs)} ({system_type}).")
+
+    def get_provider(self, env: str) -> DBInterface:
+        """Returns the cached provider for an environment, creating it on first use."""
+        env = env.upper()
+        with self._providers_lock:
+            provider = self._providers.get(env)
+            if provider is None:
+                from utils.db.factory import DBFactory
+                provider = DBFactory.get_provider(env=env, system_type=self.system_type)
+                self._providers[env] = provider
+            return provider
+
+    def run(self, method: str, *args: Any, envs: Optional[Iterable[str]] = None,
+            **kwargs: Any) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+        """Calls `method` with the same arguments on every environment in parallel.
+
+        Args:
+            method (str): Name of the DBInterface method, e.g. 'get_bom_first_level'.
+            *args, **kwargs: Arguments passed to the method.
+            envs: Optional subset of the configured environments.
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Exception]]: Results and errors, both keyed
+            by environment. A failing environment does not affect the others.
+        """
+        targets = [env.upper() for env in envs] if envs is not None else self.envs
+
+        def call(env: str) -> Any:
+            return getattr(self.get_provider(env), method)(*args, **kwargs)
+
+        futures = {env: self._executor.submit(call, env) for env in targets}
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+        for env, future in futures.items():
+            try:
+                results[env] = future.result()
+            except Exception as e:
+                log.error(f"{method} failed in {env}: {e}")
+                errors[env] = e
+
+        log.debug(f"Fan-out {method} finished: {len(results)} ok, {len(errors)} failed.")
+        return results, errors
+
+    def get_item_details(self, part_id: str) -> Dict[str, Dict[str, Any]]:
+        """Returns the item details per environment. Failed environments are omitted."""
+        results, _ = self.run("get_item_details", part_id)
+        return results
+
+    def get_bom_first_level(self, parent_part_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns the first BOM level per environment. Failed environments are omitted."""
+        results, _ = self.run("get_bom_first_level", parent_part_id)
+        return results
+
+    def compare_bom(self, parent_part_id: str, base_env: Optional[str] = None, allow_empty: bool = False,
+                    **diff_options: Any) -> Dict[str, BOMDiff]:
+        """Fetches the first BOM level from all environments concurrently and diffs each against a base.
+
+        The providers report lookup errors as an empty BOM rather than raising, so an
+        empty level cannot be told apart from a failed query. Unless `allow_empty` is
+        set, an environment returning an empty level while the base has lines is
+        therefore treated as failed: it is logged and left out of the result instead
+        of being reported as "everything removed". Likewise an empty base level while
+        another environment has lines raises instead of reporting "everything added".
+        Environments whose call raised are left out of the result.
+
+        Args:
+            parent_part_id (str): The assembly to compare.
+            base_env (str): The reference environment. Defaults to the first configured one.
+            allow_empty (bool): Diff empty levels like any other result.
+            **diff_options: Passed to diff_bom (key_fields, compare_fields).
+        Returns:
+            Dict[str, BOMDiff]: One diff per other, successfully fetched environment (base -> env).
+        Raises:
+            RuntimeError: If the BOM could not be fetched from the base environment, or the
+                base level is empty while another environment has lines (unless `allow_empty`).
+        """
+        base = (base_env or self.envs[0]).upper()
+        targets = self.envs if base in self.envs else [base] + self.envs
+        boms, errors = self.run("get_bom_first_level", parent_part_id, envs=targets)
+
+        if base not in boms:
+            raise RuntimeError(f"BOM of {parent_part_id} could not be fetched from base environment {base}: {errors.get(base)}")
+        if not boms[base] and not allow_empty:
+            non_empty = [env for env, rows in boms.items() if rows]
+            if non_empty:
+                raise RuntimeError(f"BOM of {parent_part_id} is empty in base environment {base} but has lines in "
+                                   f"{', '.join(non_empty)}; the base lookup is treated as failed.")
+
+        diffs: Dict[str, BOMDiff] = {}
+        for env, rows in boms.items():
+            if env == base:
+                continue
+            if not rows and boms[base] and not allow_empty:
+                log.warning(f"BOM {parent_part_id} is empty in {env} but has {len(boms[base])} lines in {base}; "
+                            f"treating {env} as failed.")
+                continue
+            diffs[env] = diff_bom(boms[base], rows, **diff_options)
+        for env, diff in diffs.items():
+            log.info(f"BOM {parent_part_id} {base} -> {env}: {diff.summary()}")
+        return diffs
+
+    def close(self) -> None:
+        """Shuts down the worker pool and disconnects all providers."""
+        self._executor.shutdown(wait=True)
+        with self._providers_lock:
+            for env, provider in self._providers.items():
+                try:
+                    provider.disconnect()
+                except Exception as e:
+                    log.error(f"Error disconnecting {env}: {e}")
+            self._providers.clear()
+
+    def __enter__(self) -> "EnvironmentFanOut":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
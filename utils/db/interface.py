@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Union
 from utils.logger import Logger
 
 log = Logger("DBInterface")
 
+# Named (dict) or positional (sequence) bind variables.
+BindParams = Union[Dict[str, Any], Sequence[Any]]
+
 class DBInterface(ABC):
     @abstractmethod
     def connect(self) -> None:
@@ -16,10 +19,21 @@ class DBInterface(ABC):
         pass
 
     @abstractmethod
-    def execute_query(self, query: str,) -> List[List[Any]]:
-        """Execute a query against the database and return the results as a list of lists."""
+    def execute_query(self, query: str, params: Optional[BindParams] = None) -> List[List[Any]]:
+        """Execute a query with optional bind variables and return the results as a list of lists."""
         pass
 
+    def execute_many(self, statement: str, rows: Sequence[BindParams]) -> int:
+        """Execute a statement once per parameter set.
+
+        Providers with native array binding override this and return the number of affected
+        rows reported by the database. The default runs the statement row by row and, as
+        execute_query() reports no row counts, returns the number of parameter sets executed.
+        """
+        for params in rows:
+            self.execute_query(statement, params)
+        return len(rows)
+
     @abstractmethod
     def get_item_details(self, part_id: str) -> Dict[str, Any]:
         """Retrieve details of a specific item by its part ID."""
@@ -28,4 +42,21 @@ class DBInterface(ABC):
     @abstractmethod
     def get_bom_first_level(self, parent_id: str) -> List[Dict[str, Any]]:
         """Retrieve the first level of the Bill of Materials (BOM) for a given parent item ID."""
-        pass
\ No newline at end of file
+        pass
+
+    def fetch_arrow(self, query: str, params: Optional[BindParams] = None) -> Any:
+        """Execute a query with optional bind variables and return the results as a pyarrow.Table (requires the optional 'export' extra)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support columnar fetching.")
+
+    def get_bom_first_level_arrow(self, parent_id: str) -> Any:
+        """Retrieve the first BOM level as a pyarrow.Table. Providers may override this with a native columnar fetch."""
+        from utils.db.export import rows_to_arrow
+        return rows_to_arrow(self.get_bom_first_level(parent_id))
+
+    def export_query(self, query: str, path: str, file_format: Optional[str] = None,
+                     params: Optional[BindParams] = None) -> int:
+        """Execute a query with optional bind variables and write the results to a Parquet or Feather file. Returns the number of rows written."""
+        from utils.db.export import write_table
+        table = self.fetch_arrow(query, params)
+        write_table(table, path, file_format=file_format)
+        return table.num_rows
\ No newline at end of file
@@ -0,0 +1,257 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+from utils.db.interface import DBInterface, BindParams
+from utils.logger import Logger
+
+log = Logger("BOMPrefetcher")
+
+
+class SharedBOMCache:
+    """Thread-safe LRU cache with expiry for BOM levels and item details.
+
+    One instance can be shared by several PrefetchingProviders (e.g. all chat sessions
+    of a process), so a level warmed for one session also serves the others. Cached
+    values are shared and must be treated as read-only; PrefetchingProvider hands
+    out copies. Entries expire after `ttl`
+    seconds unless put() is given a different lifetime.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 300.0):
+        """
+        Args:
+            max_entries (int): Maximum number of cached BOM levels and items together.
+            ttl (float): Default number of seconds after which an entry is considered stale.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expiry time on the monotonic clock, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a value, optionally with a lifetime other than the cache default."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class PrefetchingProvider(DBInterface):
+    """Wraps a DB provider and speculatively warms the next BOM level(s) in the background.
+
+    After get_bom_first_level() returns a level to the caller, the item details and BOM
+    levels of its children are fetched on a small worker pool and stored in the shared
+    cache, so a follow-up question about one of the children is answered without a
+    database round trip. The background work is bounded: at most `max_children` children
+    per level, `depth` levels below the requested one and `max_pending` queued tasks;
+    work beyond the budget is dropped, never queued.
+
+    Background queries should run on their own connection so they never queue behind
+    or in front of foreground queries; pass a second provider as `background_provider`.
+
+    The providers report lookup errors as an empty result, so an empty BOM level is
+    ambiguous: it is cached only for `empty_ttl` seconds when a caller asked for it,
+    and never by the background prefetcher.
+    """
+
+    def __init__(self, provider: DBInterface, cache: Optional[SharedBOMCache] = None,
+                 background_provider: Optional[DBInterface] = None, cache_namespace: str = "",
+                 depth: int = 1, max_children: int = 50, max_workers: int = 2, max_pending: int = 200,
+                 empty_ttl: float = 10.0):
+        """
+        Args:
+            provider (DBInterface): Serves foreground requests.
+            cache (SharedBOMCache): Cache shared with other providers. A private one is created if omitted.
+            background_provider (DBInterface): Used for prefetch queries. Defaults to `provider`.
+            cache_namespace (str): Distinguishes environments sharing one cache (e.g. 'PROD').
+            depth (int): Number of BOM levels prefetched below the requested one.
+            max_children (int): Maximum number of children prefetched per level.
+            max_workers (int): Size of the background worker pool.
+            max_pending (int): Maximum number of queued prefetch tasks.
+            empty_ttl (float): Seconds an empty BOM level fetched in the foreground is cached. 0 disables it.
+        """
+        self.provider = provider
+        self.background_provider = background_provider or provider
+        self.cache = cache if cache is not None else SharedBOMCache()
+        self.cache_namespace = cache_namespace
+        self.depth = depth
+        self.max_children = max_children
+        self.max_pending = max_pending
+        self.empty_ttl = empty_ttl
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bom-prefetch")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._scheduled: Set[Hashable] = set()
+        self._closed = False
+        self.stats = {"hits": 0, "misses": 0, "prefetched": 0, "dropped": 0, "errors": 0}
+        log.info(f"PrefetchingProvider initialized (depth {depth}, {max_children} children/level, {max_workers} workers).")
+
+    def __getattr__(self, name):
+        # Expose provider specific methods (e.g. execute_named) of the wrapped provider.
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _key(self, kind: str, part_id: str) -> Tuple[str, str, str]:
+        return (self.cache_namespace, kind, part_id.strip())
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def connect(self) -> None:
+        self.provider.connect()
+
+    def disconnect(self) -> None:
+        """Stops background prefetching and disconnects the wrapped provider(s)."""
+        self.close()
+        self.provider.disconnect()
+        if self.background_provider is not self.provider:
+            self.background_provider.disconnect()
+
+    # Pass-through methods forward all arguments, so provider specific options
+    # (bind parameters, batch sizes, native Arrow fetching) keep working.
+    def execute_query(self, query: str, params: Optional[BindParams] = None) -> List[List[Any]]:
+        return self.provider.execute_query(query, params)
+
+    def execute_many(self, statement: str, rows: Sequence[BindParams], *args: Any, **kwargs: Any) -> int:
+        return self.provider.execute_many(statement, rows, *args, **kwargs)
+
+    def fetch_arrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        return self.provider.fetch_arrow(query, *args, **kwargs)
+
+    def get_bom_first_level_arrow(self, parent_id: str) -> Any:
+        return self.provider.get_bom_first_level_arrow(parent_id)
+
+    def export_query(self, query: str, path: str, *args: Any, **kwargs: Any) -> Any:
+        return self.provider.export_query(query, path, *args, **kwargs)
+
+    def get_item_details(self, part_id: str) -> Dict[str, Any]:
+        key = self._key("item", part_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("hits")
+            return dict(cached)
+
+        self._count("misses")
+        item = self.provider.get_item_details(part_id)
+        if item:
+            self.cache.put(key, item)
+        return dict(item)
+
+    def get_bom_first_level(self, parent_id: str) -> List[Dict[str, Any]]:
+        key = self._key("bom", parent_id)
+        rows = self.cache.get(key)
+        if rows is not None:
+            self._count("hits")
+        else:
+            self._count("misses")
+            rows = self.provider.get_bom_first_level(parent_id)
+            if rows:
+                self.cache.put(key, rows)
+            elif self.empty_ttl > 0:
+                # Either a leaf or a failed lookup; only remember it briefly.
+                self.cache.put(key, rows, ttl=self.empty_ttl)
+
+        self._schedule_children(rows, self.depth)
+        # Cached rows are shared with other sessions; every caller gets its own copy.
+        return [dict(row) for row in rows]
+
+    def _schedule_children(self, rows: List[Dict[str, Any]], depth: int) -> None:
+        """Queues prefetch tasks for the children of a BOM level within the budget."""
+        if depth <= 0 or self._closed:
+            return
+
+        for row in rows[:self.max_children]:
+            child_id = row.get("child_id")
+            if not child_id:
+                continue
+            child_id = str(child_id)
+            key = self._key("bom", child_id)
+
+            with self._lock:
+                if key in self._scheduled:
+                    continue
+                if self._pending >= self.max_pending:
+                    self.stats["dropped"] += 1
+                    continue
+                self._pending += 1
+                self._scheduled.add(key)
+
+            try:
+                self._executor.submit(self._prefetch, child_id, depth)
+            except RuntimeError:
+                # Executor was shut down concurrently.
+                with self._lock:
+                    self._pending -= 1
+                    self._scheduled.discard(key)
+                return
+
+    def _prefetch(self, part_id: str, depth: int) -> None:
+        """Background task: warms item details and the BOM level of one part."""
+        bom_key = self._key("bom", part_id)
+        try:
+            if self._closed:
+                return
+
+            item_key = self._key("item", part_id)
+            if item_key not in self.cache:
+                item = self.background_provider.get_item_details(part_id)
+                if item:
+                    self.cache.put(item_key, item)
+
+            rows = self.cache.get(bom_key)
+            if rows is None:
+                rows = self.background_provider.get_bom_first_level(part_id)
+                if not rows:
+                    # Indistinguishable from a failed lookup, so it is not cached.
+                    return
+                self.cache.put(bom_key, rows)
+                self._count("prefetched")
+
+            self._schedule_children(rows, depth - 1)
+        except Exception as e:
+            self._count("errors")
+            log.debug(f"Prefetch of {part_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._scheduled.discard(bom_key)
+
+    def close(self) -> None:
+        """Cancels queued prefetch tasks and waits for running ones to finish."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        log.info(f"PrefetchingProvider closed. Stats: {self.stats}")
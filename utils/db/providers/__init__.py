@@ -1,4 +1,7 @@
 from .agile_e6_sql import AgileE6Provider
-from .cimdb_api import CIMDBProvider
+from .agile_e6_queries import NamedQuery, AGILE_E6_QUERIES
+from .cimdb_api import CIMDBProvider, CIMDBError
+from .cimdb_stub import CIMDBStubServer
+from .fake_db import FakeDBProvider
 
-__all__ = ["AgileE6Provider", "CIMDBProvider"]
\ No newline at end of file
+__all__ = ["AgileE6Provider", "NamedQuery", "AGILE_E6_QUERIES", "CIMDBProvider", "CIMDBError", "CIMDBStubServer", "FakeDBProvider"]
\ No newline at end of file
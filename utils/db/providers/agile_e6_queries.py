@@ -0,0 +1,108 @@
+from typing import Dict
+
+
+class NamedQuery:
+    """A static SQL statement with bind variables and its fetch tuning.
+
+    Keeping every statement as a constant text with binds (instead of building SQL
+    strings per call) lets Oracle reuse the shared cursor and lets the client
+    statement cache skip re-parsing. `arraysize` and `prefetchrows` are chosen per
+    query from its typical result size.
+
+    Attributes:
+        name (str): Registry key.
+        sql (str): The statement text, using named binds (e.g. :part_id).
+        arraysize (int): Rows fetched per round trip once fetching has started.
+        prefetchrows (int): Rows returned together with the execute call. For single-row
+            lookups arraysize=1 / prefetchrows=2 completes the query in one round trip.
+    """
+
+    def __init__(self, name: str, sql: str, arraysize: int = 100, prefetchrows: int = 2):
+        self.name = name
+        self.sql = sql
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+
+    def __repr__(self) -> str:
+        return f"NamedQuery({self.name!r}, arraysize={self.arraysize}, prefetchrows={self.prefetchrows})"
+
+
+BOM_FIRST_LEVEL = NamedQuery(
+    name="bom_first_level",
+    sql="""
+SELECT
+    son.part_id AS child_id,
+    son.item_type,
+    son.lev_ind,
+    bom.pos_no,
+    son.chk_name,
+    son.cur_flag
+FROM t_master_dat fat
+JOIN t_master_str bom ON fat.c_id = bom.c_id_1
+JOIN t_master_dat son ON bom.c_id_2 = son.c_id
+WHERE fat.part_id = :part_id
+  AND fat.cur_flag = 'y'
+ORDER BY bom.pos_no
+""",
+    # Assemblies range from a few to tens of thousands of lines.
+    arraysize=1000,
+    prefetchrows=1000,
+)
+
+ITEM_DETAILS = NamedQuery(
+    name="item_details",
+    sql="""
+SELECT
+    part_id,
+    item_type,
+    lev_ind,
+    chk_name,
+    cur_flag
+FROM t_master_dat
+WHERE part_id = :part_id
+  AND cur_flag = 'y'
+""",
+    arraysize=1,
+    prefetchrows=2,
+)
+
+WHERE_USED = NamedQuery(
+    name="where_used",
+    sql="""
+SELECT
+    fat.part_id AS parent_id,
+    fat.item_type,
+    bom.pos_no,
+    fat.chk_name
+FROM t_master_dat son
+JOIN t_master_str bom ON son.c_id = bom.c_id_2
+JOIN t_master_dat fat ON bom.c_id_1 = fat.c_id
+WHERE son.part_id = :part_id
+  AND son.cur_flag = 'y'
+  AND fat.cur_flag = 'y'
+ORDER BY fat.part_id, bom.pos_no
+""",
+    arraysize=200,
+    prefetchrows=200,
+)
+
+ITEM_VERSIONS = NamedQuery(
+    name="item_versions",
+    sql="""
+SELECT
+    part_id,
+    item_type,
+    lev_ind,
+    chk_name,
+    cur_flag
+FROM t_master_dat
+WHERE part_id = :part_id
+ORDER BY cur_flag DESC
+""",
+    arraysize=20,
+    prefetchrows=20,
+)
+
+AGILE_E6_QUERIES: Dict[str, NamedQuery] = {
+    query.name: query for query in (BOM_FIRST_LEVEL, ITEM_DETAILS, WHERE_USED, ITEM_VERSIONS)
+}
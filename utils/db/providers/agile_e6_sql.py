@@ -1,21 +1,28 @@
-from utils.db.interface import DBInterface
+from utils.db.interface import DBInterface, BindParams
+from utils.db.providers.agile_e6_queries import AGILE_E6_QUERIES, BOM_FIRST_LEVEL, ITEM_DETAILS, NamedQuery
 import oracledb
-from typing import List, Dict, Any, Optional, cast, Iterable
+import threading
+from typing import List, Dict, Any, Optional, Sequence, cast, Iterable
+from utils.db.export import require_pyarrow, lowercase_columns, write_batches
 from utils.logger import Logger
+from utils.singleflight import SingleFlight
 
 log = Logger("AgileE6Provider")
 
+# Shared by all provider instances: sessions asking for the same part at the same time share one query.
+_flights = SingleFlight(name="AgileE6Provider")
 
 class AgileE6Provider(DBInterface):
     """Oracle Agile E6 Database Provider implementation. This class provides methods to connect to an Oracle database, execute queries, and manage the connection lifecycle. It includes error handling and logging for better traceability and debugging.
     """
 
-    def __init__(self, user: str, password: str, dsn: str):
+    def __init__(self, user: str, password: str, dsn: str, stmtcachesize: int = 50):
         """Constructor for AgileE6Provider. Initializes the database connection parameters and sets up logging.
         Args:
             user (str): The username for the Oracle database.
             password (str): The password for the Oracle database.
             dsn (str): The Data Source Name (DSN) for the Oracle database.
+            stmtcachesize (int): Number of statements kept parsed in the client statement cache. Should cover all named queries plus frequently used ad-hoc statements.
         """
 
         self.params = {
@@ -23,7 +30,10 @@ class AgileE6Provider(DBInterface):
             "password": password,
             "dsn": dsn
         }
+        self.stmtcachesize = stmtcachesize
         self.connection: Optional[oracledb.Connection] = None
+        # Serializes the lazy connect, e.g. when several prefetch workers share this provider.
+        self._connect_lock = threading.Lock()
         log.info("AgileE6Provider initialized with provided database parameters.")
 
     def connect(self):
@@ -35,7 +45,7 @@ class AgileE6Provider(DBInterface):
         """
 
         try:
-            conn = oracledb.connect(**self.params)
+            conn = oracledb.connect(**self.params, stmtcachesize=self.stmtcachesize)
             if conn is None:
                 raise oracledb.Error("Oracle connect returned None unexpected.")
             
@@ -48,7 +58,7 @@ class AgileE6Provider(DBInterface):
     
     def _get_connection(self) -> oracledb.Connection:
         """Helper to satisfy the type checker regarding Optional connection.
-         This method ensures that we have a valid connection before proceeding with any database operations. If the connection is not established, it attempts to connect and then checks again to guarantee that we have a valid connection object.
+         This method ensures that we have a valid connection before proceeding with any database operations. If the connection is not established, it attempts to connect and then checks again to guarantee that we have a valid connection object. The lazy connect is thread-safe, so concurrent first calls open only one connection.
          Returns:
              oracledb.Connection: A valid Oracle database connection.
          Raises:
@@ -56,9 +66,12 @@ class AgileE6Provider(DBInterface):
         """
 
         if self.connection is None:
-            # Wir rufen connect auf, ignorieren aber den Rückgabewert der Methode
-            # und prüfen lokal erneut, um Pylance absolute Sicherheit zu geben.
-            self.connect()
+            with self._connect_lock:
+                # Erneut prüfen: ein anderer Thread kann inzwischen verbunden haben.
+                if self.connection is None:
+                    # Wir rufen connect auf, ignorieren aber den Rückgabewert der Methode
+                    # und prüfen lokal erneut, um Pylance absolute Sicherheit zu geben.
+                    self.connect()
             
         # Der "Double Check" mit Assertion oder explizitem Cast
         if self.connection is None:
@@ -80,11 +93,12 @@ class AgileE6Provider(DBInterface):
             finally:
                 self.connection = None
 
-    def execute_query(self, query: str) -> List[List[Any]]:
-        """Executes a given SQL query with optional parameters and returns the results as a list of dictionaries.
-        This method establishes a connection if not already connected, executes the provided SQL query with the given parameters, and returns the results. It includes error handling to manage any issues that may arise during query execution.
+    def execute_query(self, query: str, params: Optional[BindParams] = None) -> List[List[Any]]:
+        """Executes a given SQL query with optional bind variables and returns the results as a list of lists.
+        This method establishes a connection if not already connected, executes the provided SQL query with the given parameters, and returns the results. Values must be passed as bind variables rather than formatted into the SQL text, so that Oracle can reuse the parsed statement.
         Args:
             query (str): The SQL query to be executed.
+            params (dict | sequence): Optional bind variables (named or positional).
         Returns:
             List[List[Any]]: A list of lists representing the query results, where each inner list corresponds to a row with column values.
         Raises:
@@ -95,14 +109,100 @@ class AgileE6Provider(DBInterface):
         
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query)
+                cursor.execute(query, params)
                 conn.commit()
                 return cursor.fetchall()
         except oracledb.Error as e:
             log.error(f"Error executing query: {e}")
             raise
 
+    def execute_named(self, name: str, params: Optional[BindParams] = None) -> List[Dict[str, Any]]:
+        """Executes a query from the named-query registry and returns the rows as dictionaries.
+        The cursor is tuned with the arraysize and prefetchrows configured for the query.
+        Args:
+            name (str): The registry key, e.g. 'where_used'.
+            params (dict | sequence): Bind variables of the query.
+        Returns:
+            List[Dict[str, Any]]: One dictionary per row with lower case column names.
+        Raises:
+            KeyError: If no query with that name is registered.
+            oracledb.Error: If there is an error during query execution.
+        """
+        named_query = AGILE_E6_QUERIES[name]
+        conn = self._get_connection()
+        try:
+            return self._fetch_dicts(conn, named_query, params)
+        except oracledb.Error as e:
+            log.error(f"Error executing named query '{name}': {e}")
+            raise
+
+    def _fetch_dicts(self, conn: oracledb.Connection, named_query: NamedQuery, params: Optional[BindParams],
+                     max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Runs a registered query on a tuned cursor and maps the rows to dictionaries."""
+        with conn.cursor() as cursor:
+            cursor.arraysize = named_query.arraysize
+            cursor.prefetchrows = named_query.prefetchrows
+            cursor.execute(named_query.sql, params)
+
+            description = cursor.description
+            if description is None:
+                return []
+
+            columns = [str(col[0]).lower() for col in description]
+
+            # Fetch absichern: Wir casten das Ergebnis zu einem Iterable.
+            # Damit weiß Pylance: Man kann darüber loopen.
+            raw_data = cursor.fetchmany(max_rows) if max_rows else cursor.fetchall()
+            if raw_data is None:
+                return []
+
+            iterable_data = cast(Iterable[Any], raw_data)
+            return [dict(zip(columns, row)) for row in iterable_data]
+
+    def execute_many(self, statement: str, rows: Sequence[BindParams], batch_size: int = 10000) -> int:
+        """Executes a DML statement once per parameter set using array binding and commits.
+        Rows are sent in batches of `batch_size`, each batch in a single round trip with a single parse.
+        Args:
+            statement (str): The DML statement with bind variables.
+            rows (sequence): One set of bind variables per execution.
+            batch_size (int): Maximum number of rows sent per round trip.
+        Returns:
+            int: The total number of affected rows.
+        Raises:
+            oracledb.Error: If there is an error during execution. The transaction is rolled back.
+        """
+        conn = self._get_connection()
+        affected = 0
+
+        try:
+            with conn.cursor() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    cursor.executemany(statement, rows[start:start + batch_size])
+                    affected += cursor.rowcount
+            conn.commit()
+            log.debug(f"executemany affected {affected} rows.")
+            return affected
+        except oracledb.Error as e:
+            log.error(f"Error executing bulk statement: {e}")
+            conn.rollback()
+            raise
+
     def get_bom_first_level(self, parent_part_id: str) -> List[Dict[str, Any]]:
+        """
+        Retrieves the first level of a BOM. Concurrent identical requests against the same database and schema are coalesced into a single query; every caller receives its own copy of the rows.
+        Args:
+            parent_part_id (str): The part ID of the parent item for which to retrieve the BOM.
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries representing the child items in the BOM.
+        Raises:
+            oracledb.Error: If no database connection can be established.
+        """
+        parent_part_id = parent_part_id.strip()
+        key = SingleFlight.make_key("get_bom_first_level", self.params["dsn"], self.params["user"], parent_part_id)
+        rows = _flights.do(key, self._query_bom_first_level, parent_part_id)
+        return [dict(row) for row in rows]
+
+    def _query_bom_first_level(self, parent_part_id: str) -> List[Dict[str, Any]]:
         """
         Executes the parent-child join to retrieve the first level of a BOM.
         This method retrieves the first level of the Bill of Materials (BOM) for a given parent item ID by executing a SQL query that joins the relevant tables. It returns the results as a list of dictionaries, where each dictionary represents a child item with its details. The method includes error handling to manage any issues that may arise during query execution.
@@ -111,52 +211,32 @@ class AgileE6Provider(DBInterface):
         Returns:
             List[Dict[str, Any]]: A list of dictionaries representing the child items in the BOM, where each dictionary contains details such as child_id, item_type, lev_ind, pos_no, chk_name, and cur_flag.
         Raises:
-            oracledb.Error: If there is an error during query execution.
+            oracledb.Error: If no database connection can be established. Query errors are logged and yield an empty list.
         """
 
         conn = self._get_connection()
 
-        query = """
-        SELECT 
-            son.part_id AS child_id, 
-            son.item_type, 
-            son.lev_ind,
-            bom.pos_no, 
-            son.chk_name,
-            son.cur_flag
-        FROM t_master_dat fat
-        JOIN t_master_str bom ON fat.c_id = bom.c_id_1
-        JOIN t_master_dat son ON bom.c_id_2 = son.c_id
-        WHERE fat.part_id = :part_id 
-          AND fat.cur_flag = 'y'
-        ORDER BY bom.pos_no
-        """
-        
         try:
-            with conn.cursor() as cursor:
-                cursor.execute(query, part_id=parent_part_id)
-                
-                description = cursor.description
-                if description is None:
-                    return []
-                
-                columns = [str(col[0]).lower() for col in description]
-                
-                # Fetchall absichern: Wir casten das Ergebnis zu einem Iterable.
-                # Damit weiß Pylance: Man kann darüber loopen.
-                raw_data = cursor.fetchall()
-                if raw_data is None:
-                    return []
-                
-                iterable_data = cast(Iterable[Any], raw_data)
-                
-                results = [dict(zip(columns, row)) for row in iterable_data]
-                return results
+            return self._fetch_dicts(conn, BOM_FIRST_LEVEL, {"part_id": parent_part_id})
         except oracledb.Error as e:
             log.error(f"Error executing BOM query: {e}")
             return []
     
     def get_item_details(self, part_id: str) -> Dict[str, Any]:
+        """
+        Retrieves details of a specific item by its part ID. Concurrent identical requests against the same database and schema are coalesced into a single query; every caller receives its own copy of the result.
+        Args:
+            part_id (str): The part ID of the item for which to retrieve details.
+        Returns:
+            Dict[str, Any]: A dictionary containing the details of the item, or an empty dictionary if it is not found.
+        Raises:
+            oracledb.Error: If no database connection can be established.
+        """
+        part_id = part_id.strip()
+        key = SingleFlight.make_key("get_item_details", self.params["dsn"], self.params["user"], part_id)
+        return dict(_flights.do(key, self._query_item_details, part_id))
+
+    def _query_item_details(self, part_id: str) -> Dict[str, Any]:
         """
         Retrieves details of a specific item by its part ID.
         This method retrieves the details of a specific item from the database using its part ID. It executes a SQL query to fetch the relevant information and returns it as a dictionary. The method includes error handling to manage any issues that may arise during query execution.
@@ -165,38 +245,76 @@ class AgileE6Provider(DBInterface):
         Returns:
             Dict[str, Any]: A dictionary containing the details of the item, such as part_id, item_type, lev_ind, chk_name, and cur_flag. If the item is not found or an error occurs, an empty dictionary is returned.
         Raises:
+            oracledb.Error: If no database connection can be established. Query errors are logged and yield an empty dictionary.
+        """
+        conn = self._get_connection()
+
+        try:
+            rows = self._fetch_dicts(conn, ITEM_DETAILS, {"part_id": part_id}, max_rows=1)
+            return rows[0] if rows else {}
+        except oracledb.Error as e:
+            log.error(f"Error executing item details query: {e}")
+            return {}
+
+    def fetch_arrow(self, query: str, params: Optional[BindParams] = None, arraysize: int = 1000) -> Any:
+        """
+        Executes a query and fetches the result directly into a pyarrow.Table.
+        The rows are fetched by python-oracledb into its columnar DataFrame and handed over to pyarrow through the Arrow C interface without copying, so no Python object is created per row or value.
+        Args:
+            query (str): The SQL query to be executed.
+            params (dict | sequence): Optional bind variables.
+            arraysize (int): Number of rows fetched per round trip.
+        Returns:
+            pyarrow.Table: The query result with lower case column names.
+        Raises:
+            ImportError: If pyarrow is not installed.
             oracledb.Error: If there is an error during query execution.
         """
+        pa = require_pyarrow()
         conn = self._get_connection()
 
-        query = """
-        SELECT 
-            part_id, 
-            item_type,
-            lev_ind,
-            chk_name,             
-            cur_flag
-        FROM t_master_dat
-        WHERE part_id = :part_id
-          AND cur_flag = 'y'
+        try:
+            odf = conn.fetch_df_all(statement=query, parameters=params, arraysize=arraysize)
+            return lowercase_columns(pa.table(odf))
+        except oracledb.Error as e:
+            log.error(f"Error executing columnar query: {e}")
+            raise
+
+    def get_bom_first_level_arrow(self, parent_part_id: str) -> Any:
         """
-        
+        Retrieves the first level of the BOM as a pyarrow.Table with the same columns as get_bom_first_level.
+        Args:
+            parent_part_id (str): The part ID of the parent item for which to retrieve the BOM.
+        Returns:
+            pyarrow.Table: One row per child item.
+        """
+        return self.fetch_arrow(BOM_FIRST_LEVEL.sql, {"part_id": parent_part_id}, arraysize=BOM_FIRST_LEVEL.arraysize)
+
+    def export_query(self, query: str, path: str, file_format: Optional[str] = None,
+                     params: Optional[BindParams] = None, batch_size: int = 50000) -> int:
+        """
+        Streams the result of a query into a Parquet or Feather file.
+        The result is fetched in DataFrame batches of `batch_size` rows, so memory use stays bounded regardless of the size of the extract. An empty result still produces a file with the query's columns and no rows.
+        Args:
+            query (str): The SQL query to be executed.
+            path (str): Target file; the format is derived from the suffix unless given.
+            file_format (str): 'parquet' or 'feather'.
+            params (dict | sequence): Optional bind variables.
+            batch_size (int): Rows per fetched batch.
+        Returns:
+            int: The number of rows written.
+        Raises:
+            ImportError: If pyarrow is not installed.
+            oracledb.Error: If there is an error during query execution.
+        """
+        require_pyarrow()
+        conn = self._get_connection()
+
         try:
-            with conn.cursor() as cursor:
-                cursor.execute(query, part_id=part_id)
-                
-                description = cursor.description
-                if description is None:
-                    return {}
-                
-                columns = [str(col[0]).lower() for col in description]
-                
-                row = cursor.fetchone()
-                if row is None:
-                    return {}
-                
-                result = dict(zip(columns, row))
-                return result
+            batches = conn.fetch_df_batches(statement=query, parameters=params, size=batch_size)
+            # An empty result yields no batch; fetch_df_all still returns the (empty) result with its schema.
+            empty_table = lambda: conn.fetch_df_all(statement=query, parameters=params)
+            return write_batches(batches, path, file_format=file_format, empty_table=empty_table)
         except oracledb.Error as e:
-            log.error(f"Error executing item details query: {e}")
-            return {}
\ No newline at end of file
+            log.error(f"Error exporting query results: {e}")
+            raise
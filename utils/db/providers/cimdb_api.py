@@ -1,12 +1,354 @@
-from utils.db.interface import DBInterface
+import json
+import queue
+import threading
+import http.client
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+from utils.db.interface import DBInterface, BindParams
+from utils.db.export import require_pyarrow, lists_to_arrow, lowercase_columns
 from utils.logger import Logger
 
 log = Logger("CIMDBProvider")
 
+
+class CIMDBError(Exception):
+    """Raised when the CIMDB API answers with an unexpected HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"CIMDB API error {status}: {message}")
+        self.status = status
+
+
+class _HTTPConnectionPool:
+    """A small thread-safe pool of keep-alive HTTP(S) connections to one host.
+
+    Connections are handed out LIFO so that the most recently used (and therefore
+    most likely still open) socket is reused first. At most `maxsize` connections
+    exist at any time; further callers block until one is released.
+    """
+
+    # Errors that indicate the server silently dropped an idle keep-alive socket.
+    _STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+    # Only these may be resent: the failed attempt might already have been processed by the server.
+    _IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(self, base_url: str, maxsize: int = 8, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid CIMDB base URL: {base_url}")
+
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.maxsize = maxsize
+        self.timeout = timeout
+
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._closed = False
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn: Optional[http.client.HTTPConnection]) -> None:
+        if conn is not None:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        self._slots.release()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Sends a request over a pooled connection and returns (status, headers, body).
+
+        The response body is always read completely so the connection can be reused.
+        An idempotent request that fails on a stale keep-alive socket is retried once on
+        a fresh one. Other methods (e.g. POST /query) are never resent, since the server
+        may have executed them before the connection broke.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        retryable = method.upper() in self._IDEMPOTENT_METHODS
+        conn: Optional[http.client.HTTPConnection] = self._acquire()
+        try:
+            for attempt in range(2):
+                assert conn is not None
+                try:
+                    conn.request(method, self.base_path + path, body=body, headers=headers or {})
+                    response = conn.getresponse()
+                    data = response.read()
+                    response_headers = {k.lower(): v for k, v in response.getheaders()}
+                    if response.will_close:
+                        # http.client reopens a closed connection on its next request.
+                        conn.close()
+                    return response.status, response_headers, data
+                except self._STALE_ERRORS:
+                    conn.close()
+                    if attempt == 1 or not retryable:
+                        conn = None
+                        raise
+                    conn = self._new_connection()
+                except Exception:
+                    conn.close()
+                    conn = None
+                    raise
+            raise RuntimeError("Unreachable")  # pragma: no cover
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        """Closes all idle connections. Connections in use are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 class CIMDBProvider(DBInterface):
-    """A placeholder for the CIMDBProvider class, which will implement the DBInterface for the CIMDB API."""
+    """CIMDB REST API Provider implementation. This class implements the DBInterface on top of the CIMDB HTTP API using a keep-alive connection pool, concurrent page fetching for paginated endpoints and ETag based conditional requests, so unchanged resources are not downloaded twice.
 
-    def __init__(self, api_key: str, base_url: str):
+    Expected endpoints (relative to base_url):
+        GET  /items/{part_id}                               -> item object
+        GET  /items/{part_id}/bom?page=N&page_size=M        -> {"items": [...], "page": N, "total_pages": T}
+        POST /query  {"query": "...", "params": {...}}    -> {"columns": [...], "rows": [[...], ...]}
+    """
+
+    def __init__(self, api_key: str, base_url: str, pool_size: int = 8, max_parallel_pages: int = 4,
+                 page_size: int = 500, timeout: float = 30.0, etag_cache_size: int = 1024):
+        """Constructor for CIMDBProvider. Stores the API parameters; the connection pool is created lazily.
+        Args:
+            api_key (str): The API key sent as bearer token with every request.
+            base_url (str): The base URL of the CIMDB API (e.g. 'https://cimdb.example.com/api/v1').
+            pool_size (int): Maximum number of keep-alive connections kept open to the API.
+            max_parallel_pages (int): Upper bound for concurrently fetched pages, shared by all paginated requests of this provider.
+            page_size (int): Number of rows requested per page from paginated endpoints.
+            timeout (float): Socket timeout in seconds for a single request.
+            etag_cache_size (int): Maximum number of responses kept for conditional requests.
+        """
         self.api_key = api_key
         self.base_url = base_url
-        # Initialize any necessary components for API communication here (e.g., session, headers)   
\ No newline at end of file
+        self.pool_size = pool_size
+        self.max_parallel_pages = max(1, min(max_parallel_pages, pool_size))
+        self.page_size = page_size
+        self.timeout = timeout
+        self.etag_cache_size = etag_cache_size
+
+        self.pool: Optional[_HTTPConnectionPool] = None
+        self._page_executor: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # path -> (etag, raw response body); bodies are decoded per hit so callers never share objects.
+        self._etag_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+        log.info(f"CIMDBProvider initialized for {self.base_url}.")
+
+    def connect(self) -> None:
+        """Creates the keep-alive connection pool and the page worker pool for the configured base URL.
+
+        Raises:
+            ValueError: If the base URL is not a valid http(s) URL.
+        """
+        with self._pool_lock:
+            if self.pool is None:
+                self.pool = _HTTPConnectionPool(self.base_url, maxsize=self.pool_size, timeout=self.timeout)
+                log.info(f"CIMDB connection pool created (max {self.pool_size} connections).")
+            if self._page_executor is None:
+                self._page_executor = ThreadPoolExecutor(max_workers=self.max_parallel_pages,
+                                                         thread_name_prefix="cimdb-page")
+
+    def _get_pool(self) -> _HTTPConnectionPool:
+        """Helper that returns the connection pool, creating it on first use."""
+        if self.pool is None:
+            self.connect()
+        if self.pool is None:
+            raise RuntimeError("Failed to initialize CIMDB connection pool.")
+        return self.pool
+
+    def _get_page_executor(self) -> ThreadPoolExecutor:
+        """Helper that returns the worker pool for page requests, creating it on first use."""
+        if self._page_executor is None:
+            self.connect()
+        if self._page_executor is None:
+            raise RuntimeError("Failed to initialize CIMDB page worker pool.")
+        return self._page_executor
+
+    def disconnect(self) -> None:
+        """Stops the page workers, closes all pooled connections and drops the ETag cache."""
+        with self._pool_lock:
+            if self._page_executor:
+                self._page_executor.shutdown(wait=True)
+                self._page_executor = None
+            if self.pool:
+                self.pool.close()
+                self.pool = None
+                log.info("CIMDB connection pool closed.")
+        with self._etag_lock:
+            self._etag_cache.clear()
+
+    def _headers(self, etag: Optional[str] = None) -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+        }
+        if etag:
+            headers["If-None-Match"] = etag
+        return headers
+
+    def _get_json(self, path: str) -> Any:
+        """Performs a conditional GET and returns the decoded JSON payload.
+
+        If a previous response for the same path carried an ETag, it is sent as
+        If-None-Match; a 304 answer is served from the local cache. The cache keeps
+        the raw body and decodes it on every hit, so each caller gets its own objects.
+
+        Raises:
+            CIMDBError: If the API answers with a non-success status.
+        """
+        with self._etag_lock:
+            cached = self._etag_cache.get(path)
+            if cached is not None:
+                self._etag_cache.move_to_end(path)
+
+        status, headers, body = self._get_pool().request("GET", path, headers=self._headers(cached[0] if cached else None))
+
+        if status == 304 and cached is not None:
+            log.debug(f"CIMDB 304 Not Modified: {path}")
+            return json.loads(cached[1])
+        if status != 200:
+            raise CIMDBError(status, body.decode("utf-8", errors="replace")[:200])
+
+        payload = json.loads(body)
+        etag = headers.get("etag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[path] = (etag, body)
+                self._etag_cache.move_to_end(path)
+                while len(self._etag_cache) > self.etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+        return payload
+
+    def _get_paginated(self, path: str) -> List[Dict[str, Any]]:
+        """Fetches all pages of a paginated resource.
+
+        The first page is requested on its own to learn 'total_pages'; the remaining
+        pages are then fetched concurrently on the provider's page workers, so at most
+        `max_parallel_pages` page requests are in flight. Rows are returned in page order.
+        """
+        def page_path(page: int) -> str:
+            return f"{path}?{urlencode({'page': page, 'page_size': self.page_size})}"
+
+        first = self._get_json(page_path(1))
+        rows: List[Dict[str, Any]] = list(first.get("items", []))
+        total_pages = int(first.get("total_pages", 1))
+
+        if total_pages > 1:
+            pages = self._get_page_executor().map(lambda p: self._get_json(page_path(p)), range(2, total_pages + 1))
+            for page in pages:
+                rows.extend(page.get("items", []))
+
+        log.debug(f"Fetched {len(rows)} rows from {total_pages} page(s) of {path}")
+        return rows
+
+    def _post_query(self, query: str, params: Optional[BindParams] = None) -> Dict[str, Any]:
+        """Sends a query to the CIMDB query endpoint and returns the decoded payload.
+
+        Raises:
+            CIMDBError: If the API rejects the query.
+        """
+        request: Dict[str, Any] = {"query": query}
+        if params is not None:
+            request["params"] = params if isinstance(params, dict) else list(params)
+        body = json.dumps(request, default=str).encode("utf-8")
+        headers = self._headers()
+        headers["Content-Type"] = "application/json"
+
+        try:
+            status, _, data = self._get_pool().request("POST", "/query", body=body, headers=headers)
+        except OSError as e:
+            log.error(f"Error executing CIMDB query: {e}")
+            raise
+
+        if status != 200:
+            error = CIMDBError(status, data.decode("utf-8", errors="replace")[:200])
+            log.error(f"Error executing CIMDB query: {error}")
+            raise error
+        return json.loads(data)
+
+    def execute_query(self, query: str, params: Optional[BindParams] = None) -> List[List[Any]]:
+        """Sends a query to the CIMDB query endpoint and returns the rows as a list of lists.
+        Args:
+            query (str): The query to be executed by the CIMDB API.
+            params (dict | sequence): Optional query parameters, sent separately from the query text.
+        Returns:
+            List[List[Any]]: The result rows.
+        Raises:
+            CIMDBError: If the API rejects the query.
+        """
+        return self._post_query(query, params).get("rows", [])
+
+    def fetch_arrow(self, query: str, params: Optional[BindParams] = None) -> Any:
+        """Sends a query to the CIMDB query endpoint and returns the result as a pyarrow.Table.
+        Args:
+            query (str): The query to be executed by the CIMDB API.
+            params (dict | sequence): Optional query parameters, sent separately from the query text.
+        Raises:
+            ImportError: If pyarrow is not installed.
+            CIMDBError: If the API rejects the query.
+        """
+        require_pyarrow()
+        payload = self._post_query(query, params)
+        rows = payload.get("rows", [])
+        columns = payload.get("columns") or [f"col_{i}" for i in range(len(rows[0]) if rows else 0)]
+        return lowercase_columns(lists_to_arrow(rows, columns))
+
+    def get_bom_first_level(self, parent_part_id: str) -> List[Dict[str, Any]]:
+        """
+        Retrieves the first level of the BOM for a given parent part ID, fetching all pages concurrently.
+        Args:
+            parent_part_id (str): The part ID of the parent item for which to retrieve the BOM.
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries representing the child items in the BOM. An empty list is returned if the item is unknown or an error occurs.
+        """
+        try:
+            return self._get_paginated(f"/items/{quote(parent_part_id, safe='')}/bom")
+        except CIMDBError as e:
+            if e.status != 404:
+                log.error(f"Error fetching BOM for {parent_part_id}: {e}")
+            return []
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            log.error(f"Error fetching BOM for {parent_part_id}: {e}")
+            return []
+
+    def get_item_details(self, part_id: str) -> Dict[str, Any]:
+        """
+        Retrieves details of a specific item by its part ID.
+        Args:
+            part_id (str): The part ID of the item for which to retrieve details.
+        Returns:
+            Dict[str, Any]: A dictionary containing the details of the item. If the item is not found or an error occurs, an empty dictionary is returned.
+        """
+        try:
+            return self._get_json(f"/items/{quote(part_id, safe='')}")
+        except CIMDBError as e:
+            if e.status != 404:
+                log.error(f"Error fetching item details for {part_id}: {e}")
+            return {}
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            log.error(f"Error fetching item details for {part_id}: {e}")
+            return {}
@@ -0,0 +1,171 @@
+import json
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+from utils.logger import Logger
+
+log = Logger("CIMDBStubServer")
+
+
+class CIMDBStubServer:
+    """Local in-process stand-in for the CIMDB REST API, used to exercise CIMDBProvider without network access.
+
+    Serves the same endpoints the provider expects (items, paginated BOMs and the query
+    endpoint) from in-memory fixtures, honours keep-alive, emits ETags and answers
+    conditional requests with 304. Request counters allow checking pooling and caching
+    behaviour.
+
+    Usage:
+        with CIMDBStubServer(items={...}, boms={...}) as server:
+            provider = CIMDBProvider(api_key=server.api_key, base_url=server.base_url)
+    """
+
+    def __init__(self, items: Optional[Dict[str, Dict[str, Any]]] = None,
+                 boms: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 query_rows: Optional[List[List[Any]]] = None,
+                 query_columns: Optional[List[str]] = None,
+                 api_key: str = "stub-key", host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """Creates the stub server. Port 0 picks a free port.
+        Args:
+            items (dict): Item payloads keyed by part ID.
+            boms (dict): Child rows of the first BOM level keyed by parent part ID.
+            query_rows (list): Rows returned for every POST /query request.
+            query_columns (list): Column names returned alongside query_rows.
+            api_key (str): The bearer token the server accepts.
+            latency (float): Seconds each request is delayed, to simulate a remote API.
+        """
+        self.items = items or {}
+        self.boms = boms or {}
+        self.query_rows = query_rows or []
+        self.query_columns = query_columns or [f"col_{i}" for i in range(len(self.query_rows[0]) if self.query_rows else 0)]
+        self.api_key = api_key
+        self.latency = latency
+
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.connection_count = 0
+        # Decoded bodies of all POST /query requests, in arrival order.
+        self.queries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CIMDBStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="cimdb-stub", daemon=True)
+        self._thread.start()
+        log.info(f"CIMDB stub server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+        log.info("CIMDB stub server stopped.")
+
+    def __enter__(self) -> "CIMDBStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def log_message(self, format, *args):
+                log.debug(format % args)
+
+            def _send_json(self, status: int, payload: Any) -> None:
+                body = json.dumps(payload, default=str).encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+                if self.command == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self) -> bool:
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if self.headers.get("Authorization") != f"Bearer {stub.api_key}":
+                    self._send_json(401, {"error": "unauthorized"})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+
+                url = urlsplit(self.path)
+                segments = [unquote(s) for s in url.path.strip("/").split("/")]
+
+                if len(segments) == 2 and segments[0] == "items":
+                    item = stub.items.get(segments[1])
+                    if item is None:
+                        self._send_json(404, {"error": "not found"})
+                    else:
+                        self._send_json(200, item)
+
+                elif len(segments) == 3 and segments[0] == "items" and segments[2] == "bom":
+                    rows = stub.boms.get(segments[1])
+                    if rows is None:
+                        self._send_json(404, {"error": "not found"})
+                        return
+                    params = parse_qs(url.query)
+                    page = int(params.get("page", ["1"])[0])
+                    page_size = int(params.get("page_size", ["500"])[0])
+                    total_pages = max(1, -(-len(rows) // page_size))
+                    start = (page - 1) * page_size
+                    self._send_json(200, {
+                        "items": rows[start:start + page_size],
+                        "page": page,
+                        "total_pages": total_pages,
+                    })
+                else:
+                    self._send_json(404, {"error": "unknown endpoint"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not self._authorized():
+                    return
+                if urlsplit(self.path).path.rstrip("/") == "/query":
+                    with stub._lock:
+                        stub.queries.append(json.loads(body or b"{}"))
+                    self._send_json(200, {"columns": stub.query_columns, "rows": stub.query_rows})
+                else:
+                    self._send_json(404, {"error": "unknown endpoint"})
+
+        return Handler
@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from utils.db.interface import DBInterface, BindParams
+from utils.logger import Logger
+
+log = Logger("FakeDBProvider")
+
+
+class FakeDBProvider(DBInterface):
+    """In-memory stand-in for a PLM database with injected latency, for load tests and offline development.
+
+    Serves a synthetic, deterministic product structure: every assembly 'ASM-<path>'
+    has `fanout` children, assemblies down to `depth` levels and parts ('PRT-<path>')
+    below. Each call sleeps for `latency` seconds plus up to `jitter` seconds, which
+    releases the GIL like a real network round trip would.
+    """
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.01, fanout: int = 20, depth: int = 3,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency (float): Base latency per call in seconds.
+            jitter (float): Maximum additional random latency in seconds.
+            fanout (int): Number of children per assembly.
+            depth (int): Number of assembly levels below a root assembly.
+            seed (int): Seed for the latency jitter.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.fanout = fanout
+        self.depth = depth
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.query_count = 0
+        self.connected = False
+
+    def _wait(self) -> None:
+        with self._lock:
+            self.query_count += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        time.sleep(delay)
+
+    def connect(self) -> None:
+        self.connected = True
+
+    def disconnect(self) -> None:
+        self.connected = False
+
+    def execute_query(self, query: str, params: Optional[BindParams] = None) -> List[List[Any]]:
+        self._wait()
+        return [[1]]
+
+    def get_item_details(self, part_id: str) -> Dict[str, Any]:
+        self._wait()
+        part_id = part_id.strip()
+        if not part_id.startswith(("ASM-", "PRT-")):
+            return {}
+        return {
+            "part_id": part_id,
+            "item_type": "ASSEMBLY" if part_id.startswith("ASM-") else "PART",
+            "lev_ind": part_id.count("."),
+            "chk_name": f"Synthetic {part_id}",
+            "cur_flag": "y",
+        }
+
+    def get_bom_first_level(self, parent_part_id: str) -> List[Dict[str, Any]]:
+        self._wait()
+        parent_part_id = parent_part_id.strip()
+        if not parent_part_id.startswith("ASM-"):
+            return []
+
+        level = parent_part_id.count(".")
+        prefix = "ASM" if level + 1 < self.depth else "PRT"
+        path = parent_part_id[4:]
+        return [
+            {
+                "child_id": f"{prefix}-{path}.{pos}",
+                "item_type": "ASSEMBLY" if prefix == "ASM" else "PART",
+                "lev_ind": level + 1,
+                "pos_no": pos * 10,
+                "chk_name": f"Synthetic {prefix}-{path}.{pos}",
+                "cur_flag": "y",
+            }
+            for pos in range(1, self.fanout + 1)
+        ]
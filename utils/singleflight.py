@@ -0,0 +1,170 @@
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from utils.logger import Logger
+
+log = Logger("SingleFlight")
+
+
+class _Call:
+    """State of one in-flight execution shared by its leader and all waiters."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent identical calls so that one execution serves all callers.
+
+    The first caller for a key (the leader) executes the function; callers arriving
+    with the same key while it runs wait for and receive the same result. Nothing is
+    cached: once the execution finished, the next call for the key runs again.
+
+    Semantics:
+        * Results: all callers of one flight receive the very same object. Return
+          immutable values or copy mutable ones before handing them out.
+        * Errors: an exception raised by the execution is re-raised to the leader and
+          to every waiter of that flight. The failure is not remembered.
+        * Timeouts: `timeout` only bounds how long a waiter blocks; a waiter that times
+          out gets a TimeoutError while the execution continues for the others. Waiter
+          timeouts never interrupt the leader, so the called function must bound its
+          own runtime.
+        * Threads and asyncio: `do()` serves threads. `do_async()` accepts plain
+          functions (run in a worker thread and shared with threaded callers) and
+          coroutine functions (shared between tasks of the same event loop).
+        * Cancellation: cancelling a caller, the leader included, only stops that
+          caller from waiting. A shared coroutine runs in its own task and finishes
+          for the remaining callers; it is never cancelled on their behalf.
+
+    Usage:
+        flights = SingleFlight()
+        key = SingleFlight.make_key("get_item_details", "4711")
+        item = flights.do(key, provider.get_item_details, "4711")
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], "asyncio.Task[Any]"] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "shared": 0, "timeouts": 0}
+
+    @staticmethod
+    def _normalize(value: Any) -> Hashable:
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), SingleFlight._normalize(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [SingleFlight._normalize(v) for v in value]
+            return frozenset(items) if isinstance(value, (set, frozenset)) else tuple(items)
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return repr(value)
+
+    @staticmethod
+    def make_key(method: str, *args: Any, **kwargs: Any) -> Hashable:
+        """Builds a flight key from a method name and its arguments.
+
+        Strings are stripped, containers are converted to hashable tuples and keyword
+        arguments are sorted, so equivalent calls map to the same key.
+        """
+        return (method,
+                SingleFlight._normalize(args),
+                tuple(sorted((k, SingleFlight._normalize(v)) for k, v in kwargs.items())))
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any,
+           timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Executes `fn(*args, **kwargs)` unless an identical call is already in flight.
+
+        Args:
+            key: The flight key, usually built with make_key().
+            fn: The function to execute.
+            timeout (float): Maximum seconds a waiter blocks for the leader's result.
+        Returns:
+            The result of the (shared) execution.
+        Raises:
+            TimeoutError: If a waiter did not receive the result within `timeout`.
+            Exception: Whatever the execution raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executions"] += 1
+            else:
+                call.waiters += 1
+                self.stats["shared"] += 1
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+                if call.waiters:
+                    log.debug(f"[{self.name}] {call.waiters} waiter(s) served by one execution of {key!r}")
+        elif not call.event.wait(timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Any], *args: Any,
+                       timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Async variant of do() with the same error and timeout semantics.
+
+        Plain functions run in a worker thread and share their flight with threaded
+        callers of do(). Coroutine functions are awaited on the current event loop and
+        shared with other tasks of that loop.
+        """
+        if not inspect.iscoroutinefunction(fn):
+            return await asyncio.to_thread(self.do, key, fn, *args, timeout=timeout, **kwargs)
+
+        loop_key = (id(asyncio.get_running_loop()), key)
+
+        with self._lock:
+            task = self._async_calls.get(loop_key)
+            leader = task is None
+            if task is None:
+                # Own task, so the execution does not belong to (and die with) the leader.
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                self._async_calls[loop_key] = task
+                task.add_done_callback(lambda done: self._finish_async(loop_key, done))
+                self.stats["executions"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        # shield: a caller timing out or being cancelled must not cancel the shared execution.
+        if leader:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight call {key!r}") from None
+
+    def _finish_async(self, loop_key: Tuple[int, Hashable], task: "asyncio.Task[Any]") -> None:
+        with self._lock:
+            if self._async_calls.get(loop_key) is task:
+                del self._async_calls[loop_key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller has gone.
+            task.exception()